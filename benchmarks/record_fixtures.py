@@ -0,0 +1,212 @@
+"""
+Build the page and GNews fixtures used by run_benchmarks.py.
+
+    python benchmarks/record_fixtures.py              # record live pages + GNews (needs cred.json)
+    python benchmarks/record_fixtures.py --synthetic  # regenerate the checked-in synthetic set
+
+Recording saves the raw GNews search response per region and, for every
+domain in ALLOWED_DOMAINS that appears in it, the HTML of one article.
+Domains without a recorded page keep their synthetic fixture.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import charleston_safety_trends_GNEWS as pipeline
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+PAGES_DIR = os.path.join(FIXTURES_DIR, "pages")
+GNEWS_FIXTURE = os.path.join(FIXTURES_DIR, "gnews_search.json")
+
+# -----------------------------
+# SYNTHETIC FIXTURES
+# -----------------------------
+
+# (article container, byline markup) per domain, covering the selector styles
+# the parsers have to handle
+LAYOUTS = {
+    "live5news.com": ('<div class="article-body">', '<span class="author-name">{author}</span>'),
+    "abcnews4.com": ('<div class="story-body">', '<div class="byline">By {author}</div>'),
+    "counton2.com": ('<div class="article-content">', '<p class="article-author">{author}</p>'),
+    "postandcourier.com": ('<article>', '<div class="author-block"><span>{author}</span></div>'),
+    "thestate.com": ('<div class="story-content">', '<span class="byline-name">{author}</span>'),
+    "greenvilleonline.com": ('<div class="c-article__body">', '<a class="c-article__author">{author}</a>'),
+    "greenvillejournal.com": ('<div class="entry-content">', '<span class="post-author">{author}</span>'),
+    "wyff4.com": ('<div class="article-body-content">', '<span class="article-byline">By {author}</span>'),
+    "foxcarolina.com": ('<div class="article__body">', '<div class="article__byline">{author}</div>'),
+    "wspa.com": ('<div class="article-text">', '<span class="story-byline">{author}</span>'),
+    "wgog.com": ('<div class="post-content">', '<span class="meta-author">{author}</span>'),
+    "wsnwradio.com": ('<div itemprop="articleBody">', '<p>By {author}</p>'),
+    "wlos.com": ('<div class="content-body">', '<div class="article-header__author">{author}</div>'),
+}
+
+FIRST = ["John", "Maria", "Darnell", "Emily", "Carlos", "Aisha", "Robert", "Keisha", "Thomas", "Linda"]
+LAST = ["Smith", "Johnson", "Williams", "Brown", "Garcia", "Davis", "Miller", "Wilson", "Moore", "Taylor"]
+PLACES = [
+    ("CHARLESTON", "Interstate 26 near Exit 212"), ("NORTH CHARLESTON", "Rivers Avenue"),
+    ("SUMMERVILLE", "Dorchester Road"), ("GOOSE CREEK", "Red Bank Road"),
+    ("GREENVILLE", "Interstate 85 near Woodruff Road"), ("SPARTANBURG", "Asheville Highway"),
+    ("COLUMBIA", "Interstate 20"),
+]
+FILLER = [
+    "Traffic was backed up for several miles while crews cleared the scene.",
+    "Investigators have not said whether speed or impairment played a role.",
+    "The South Carolina Highway Patrol is investigating the collision.",
+    "Anyone who witnessed the crash is asked to call the agency's tip line.",
+    "Lanes reopened shortly before noon, according to the Department of Transportation.",
+    "The intersection has seen several serious crashes in recent years, neighbors said.",
+]
+
+def _person(rng):
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+
+def synthetic_story(domain, rng):
+    """Title, description and paragraphs for one made-up crash story."""
+    city, road = rng.choice(PLACES)
+    victim, driver, author = _person(rng), _person(rng), _person(rng)
+    age, speed = rng.randint(18, 80), rng.choice([45, 55, 70, 80])
+    day = rng.randint(1, 28)
+    paragraphs = [
+        f"{city} — A {age}-year-old died after a two-vehicle crash on {road} early Tuesday, authorities said.",
+        f"{victim}, {age}, was pronounced dead at the scene, the county coroner said on Oct. {day}, 2026.",
+        f"Troopers said {driver}, {rng.randint(18, 70)}, was driving a pickup at about {speed} mph when it crossed the center line.",
+        f"\"This was a tragic and preventable collision,\" said Cpl. Sonny Collins of the Highway Patrol.",
+        f"{driver} was charged with reckless vehicular homicide and booked into the county detention center.",
+        f"{victim}'s sister said the family is devastated.",
+    ]
+    paragraphs += rng.sample(FILLER, 4)
+    title = f"{victim.split()[0]} {victim.split()[1]}, {age}, killed in {road} crash in {city.title()}"
+    return {
+        "title": title,
+        "description": paragraphs[0],
+        "paragraphs": paragraphs,
+        "author": author,
+    }
+
+def synthetic_page(domain, story, rng):
+    container, byline = LAYOUTS[domain]
+    close = "</article>" if container == "<article>" else "</div>"
+    # Real pages are mostly navigation, related links and script payloads;
+    # pad to a similar size so parse timings mean something
+    nav = "".join(
+        f'<li><a href="/{w}/{n}">{w.title()} {n}</a></li>'
+        for w in ("news", "weather", "sports", "traffic") for n in range(40)
+    )
+    related = "".join(
+        f'<div class="card"><a href="/news/story-{n}"><img src="/img/{n}.jpg" alt="">'
+        f'<span>{rng.choice(FILLER)}</span></a></div>'
+        for n in range(60)
+    )
+    payload = json.dumps({"site": domain, "items": [{"id": n, "slot": f"ad-{n}"} for n in range(600)]})
+    ads = '<div class="ad">Advertisement</div><p>Cookie settings and privacy policy</p>'
+    body = "\n".join(f"<p>{p}</p>" for p in story["paragraphs"])
+    bio = (
+        f"<p>{story['author']} covers public safety for the newsroom. "
+        f"Reach {story['author'].split()[0]} at newsroom@{domain}.</p>"
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>{story['title']} | {domain}</title>
+<meta name="description" content="{story['description']}">
+<script>window.__analytics = {payload};</script>
+<style>body {{ font-family: sans-serif; }} .ad {{ display: none; }}</style>
+</head><body>
+<header><nav><ul>{nav}</ul></nav></header>
+<main>
+<h1>{story['title']}</h1>
+{byline.format(author=story['author'])}
+<time>Published Oct. {rng.randint(1, 28)}, 2026</time>
+{container}
+{bio}
+{body}
+{ads}
+{close}
+<aside><h3>Trending</h3><p>Weather: thunderstorms and windy conditions expected this forecast period.</p>{related}</aside>
+</main>
+<footer><p>Copyright 2026 {domain}. All rights reserved.</p></footer>
+<script src="https://cdn.{domain}/bundle.js"></script>
+</body></html>
+"""
+
+def write_synthetic(seed=2026):
+    rng = random.Random(seed)
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    articles = []
+    for i, domain in enumerate(pipeline.ALLOWED_DOMAINS):
+        story = synthetic_story(domain, rng)
+        with open(os.path.join(PAGES_DIR, f"{domain}.html"), "w", encoding="utf-8") as f:
+            f.write(synthetic_page(domain, story, rng))
+        articles.append({
+            "title": story["title"],
+            "description": story["description"],
+            "content": story["paragraphs"][1][:200] + "... [1520 chars]",
+            "url": f"https://www.{domain}/news/crash-{i}",
+            "publishedAt": f"2026-10-{1 + i:02d}T12:00:00Z",
+            "source": {"name": domain, "url": f"https://www.{domain}"},
+        })
+
+    # A second outlet's take on the first story, for near-duplicate clustering
+    dup = dict(articles[0], url=f"https://www.{pipeline.ALLOWED_DOMAINS[1]}/news/crash-dup",
+               title="Coroner identifies " + articles[0]["title"].split(",")[0] + " as crash victim")
+    articles.append(dup)
+
+    with open(GNEWS_FIXTURE, "w", encoding="utf-8") as f:
+        json.dump({"totalArticles": len(articles), "articles": articles}, f, indent=2)
+    print(f"Wrote {len(pipeline.ALLOWED_DOMAINS)} synthetic pages and {GNEWS_FIXTURE}")
+
+# -----------------------------
+# LIVE RECORDING
+# -----------------------------
+
+def record_live():
+    state = pipeline.GNewsState(os.path.join(tempfile.mkdtemp(), "gnews_state.json"))
+    articles = []
+    for region in pipeline.setting("ACTIVE_REGIONS", pipeline.ACTIVE_REGIONS):
+        articles.extend(pipeline.fetch_gnews_articles(region, state))
+
+    for art in articles:
+        art.pop("region", None)
+    with open(GNEWS_FIXTURE, "w", encoding="utf-8") as f:
+        json.dump({"totalArticles": len(articles), "articles": articles}, f, indent=2)
+    print(f"Recorded {len(articles)} GNews articles")
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    recorded = set()
+    for art in articles:
+        domain = pipeline.article_domain(art["url"])
+        if domain not in pipeline.ALLOWED_DOMAINS or domain in recorded:
+            continue
+        try:
+            _, html = pipeline.download_article_html(art["url"])
+        except Exception as e:
+            print(f"{domain}: {e}")
+            continue
+        with open(os.path.join(PAGES_DIR, f"{domain}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        recorded.add(domain)
+        print(f"{domain}: {urlparse(art['url']).path}")
+
+    missing = sorted(set(pipeline.ALLOWED_DOMAINS) - recorded)
+    if missing:
+        print(f"No article found for {', '.join(missing)}; keeping their existing fixtures")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or regenerate benchmark fixtures")
+    parser.add_argument("--synthetic", action="store_true", help="write the synthetic fixture set")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        write_synthetic()
+    else:
+        record_live()
+
+if __name__ == "__main__":
+    main()
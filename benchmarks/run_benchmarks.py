@@ -0,0 +1,278 @@
+"""
+Offline benchmarks for the crash-news pipeline.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<earlier>.json
+
+Everything runs against local fixtures: pages and a GNews response from
+benchmarks/fixtures (see record_fixtures.py) served over loopback HTTP, and
+stub_llm_server.py in place of llama-server. Results are written as JSON to
+benchmarks/results/; --compare exits non-zero if a benchmark got slower than
+--tolerance allows.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import charleston_safety_trends_GNEWS as pipeline
+from stub_llm_server import start_in_thread as start_stub_llm
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+PAGES_DIR = os.path.join(FIXTURES_DIR, "pages")
+GNEWS_FIXTURE = os.path.join(FIXTURES_DIR, "gnews_search.json")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# -----------------------------
+# FIXTURES
+# -----------------------------
+
+def load_pages():
+    pages = {}
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), "r", encoding="utf-8") as f:
+                pages[name[:-len(".html")]] = f.read()
+    return pages
+
+def load_gnews():
+    with open(GNEWS_FIXTURE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves /pages/<domain>.html and a GNews-style /search whose article URLs
+    point back at those pages.
+    """
+    daemon_threads = True
+
+    def __init__(self, pages, gnews):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.pages = pages
+        self.gnews = gnews
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def local_url(self, url):
+        domain = pipeline.article_domain(url)
+        return f"{self.url}/pages/{domain}.html?{urlparse(url).path}"
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type):
+        out = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/search":
+            data = dict(self.server.gnews)
+            data["articles"] = [
+                dict(art, url=self.server.local_url(art["url"])) for art in data["articles"]
+            ]
+            self._send(json.dumps(data), "application/json")
+        elif path.startswith("/pages/") and path[len("/pages/"):-len(".html")] in self.server.pages:
+            self._send(self.server.pages[path[len("/pages/"):-len(".html")]], "text/html; charset=utf-8")
+        else:
+            self.send_error(404)
+
+def start_fixture_server(pages, gnews):
+    server = FixtureServer(pages, gnews)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# -----------------------------
+# TIMING
+# -----------------------------
+
+def bench(name, fn, repeat, results):
+    """Run fn() `repeat` times; record min/median/mean wall time in ms."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    results[name] = {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "runs": repeat,
+    }
+    print(f"{name:<40} median {results[name]['median_ms']:>10.3f} ms")
+
+def isolate_state(tmp_dir):
+    """Point every cache and state file at `tmp_dir` so runs start cold."""
+    pipeline.ARTICLE_CACHE = pipeline.ArticleCache(os.path.join(tmp_dir, "article_cache.sqlite"))
+    pipeline.LLM_CACHE = pipeline.LLMCache(os.path.join(tmp_dir, "llm_cache.sqlite"))
+    pipeline.DOMAIN_PROFILES = pipeline.DomainProfiles(os.path.join(tmp_dir, "domain_profiles.json"))
+    pipeline.GNEWS_STATE = pipeline.GNewsState(os.path.join(tmp_dir, "gnews_state.json"))
+    pipeline.INCIDENT_STORE = pipeline.IncidentStore(os.path.join(tmp_dir, "incidents.sqlite"))
+    pipeline.JOB_QUEUE = pipeline.JobQueue(os.path.join(tmp_dir, "jobs.sqlite"))
+    pipeline.RUN_REPORT_PATH = os.path.join(tmp_dir, "run_report.json")
+    pipeline.WORKER_REPORT_DIR = os.path.join(tmp_dir, "worker_reports")
+
+# -----------------------------
+# BENCHMARKS
+# -----------------------------
+
+def micro_benchmarks(pages, gnews, fixture_server, repeat, results):
+    from bs4 import BeautifulSoup
+
+    texts = {domain: pipeline.parse_article_html(html) for domain, html in pages.items()}
+    soups = {domain: BeautifulSoup(html, "html.parser") for domain, html in pages.items()}
+    page_urls = [f"{fixture_server.url}/pages/{domain}.html" for domain in pages]
+
+    bench("parse_article_html (all pages)",
+          lambda: [pipeline.parse_article_html(html) for html in pages.values()],
+          repeat, results)
+    bench("parse_article_bs4 (all pages)",
+          lambda: [pipeline._parse_article_bs4(html) for html in pages.values()],
+          repeat, results)
+    bench("fetch_article_text (all pages, loopback)",
+          lambda: [pipeline.fetch_article_text(url) for url in page_urls],
+          repeat, results)
+    bench("extract_author_name (all pages)",
+          lambda: [pipeline.extract_author_name(soup) for soup in soups.values()],
+          repeat, results)
+    bench("extract_structured_facts (all pages)",
+          lambda: [pipeline.extract_structured_facts(text) for text in texts.values()],
+          repeat, results)
+    bench("remove_author_bio (all pages)",
+          lambda: [pipeline.remove_author_bio(text) for text in texts.values()],
+          repeat, results)
+
+    # GNews fixture repeated to a busy day's worth of articles
+    articles = [
+        dict(art, url=f"{art['url']}?{n}", title=f"{art['title']} {n % 50}")
+        for n in range(40) for art in gnews["articles"]
+    ]
+    bench("dedupe_articles (%d articles)" % len(articles),
+          lambda: pipeline.dedupe_articles(articles), repeat, results)
+    bench("dedupe_article_title (%d articles)" % len(articles),
+          lambda: pipeline.dedupe_article_title(articles), repeat, results)
+    bench("cluster_near_duplicates (%d articles)" % len(gnews["articles"]),
+          lambda: pipeline.cluster_near_duplicates(gnews["articles"]), repeat, results)
+
+def end_to_end(fixture_server, args, results):
+    """run_test_pipeline against the fixtures and a stub llama-server, cold caches."""
+    stub = start_stub_llm(
+        prompt_latency=args.prompt_latency, token_latency=args.token_latency, slots=args.slots
+    )
+    sent = []
+    pipeline._conf = {
+        "GNEWS_API_KEY": "benchmark",
+        "LLAMA_SERVER_URL": stub.url,
+        "ACTIVE_REGIONS": ["charleston"],
+    }
+    pipeline.GNEWS_SEARCH_URL = f"{fixture_server.url}/search"
+    pipeline.GNEWS_RATE_LIMITER = pipeline.RateLimiter(0)
+    pipeline.send_incident_email = sent.extend
+
+    times = []
+    for _ in range(args.e2e_repeat):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            isolate_state(tmp_dir)
+            sent.clear()
+            start = time.perf_counter()
+            pipeline.run_test_pipeline()
+            times.append((time.perf_counter() - start) * 1000)
+            with open(pipeline.RUN_REPORT_PATH, "r") as f:
+                stages = json.load(f)["stages"]
+
+    results["run_test_pipeline (end to end)"] = {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "runs": args.e2e_repeat,
+        "incidents": len(sent),
+        "llm_requests_per_run": stub.requests // args.e2e_repeat,
+        "stages": stages,   # run report of the last run
+    }
+    print(f"{'run_test_pipeline (end to end)':<40} median {statistics.median(times):>10.3f} ms"
+          f"  ({len(sent)} incidents)")
+    stub.shutdown()
+
+# -----------------------------
+# RESULTS
+# -----------------------------
+
+def compare(results, baseline_path, tolerance):
+    """Names of benchmarks whose median is more than `tolerance` slower than the baseline."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)["benchmarks"]
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before["median_ms"]:
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1
+        if change > tolerance:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {before['median_ms']} -> {result['median_ms']} ms ({change:+.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per microbenchmark")
+    parser.add_argument("--e2e-repeat", type=int, default=3, help="end-to-end runs")
+    parser.add_argument("--skip-e2e", action="store_true", help="microbenchmarks only")
+    parser.add_argument("--prompt-latency", type=float, default=0.05,
+                        help="stub LLM seconds per request")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="stub LLM seconds per output word")
+    parser.add_argument("--slots", type=int, default=2, help="stub LLM parallel slots")
+    parser.add_argument("--output", help="results file (default: results/<UTC time>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before --compare fails (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    pages, gnews = load_pages(), load_gnews()
+    fixture_server = start_fixture_server(pages, gnews)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        isolate_state(tmp_dir)
+        micro_benchmarks(pages, gnews, fixture_server, args.repeat, results)
+    if not args.skip_e2e:
+        end_to_end(fixture_server, args, results)
+    fixture_server.shutdown()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": sys.version.split()[0],
+            "fixture_pages": len(pages),
+            "benchmarks": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
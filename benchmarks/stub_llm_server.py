@@ -0,0 +1,138 @@
+"""
+Stand-in for llama-server with canned answers and configurable latency.
+
+    python benchmarks/stub_llm_server.py --port 8081 --prompt-latency 0.2 --token-latency 0.005
+
+Serves /v1/chat/completions (plain and streamed), /tokenize and /props.
+At most `--slots` completions run at once, like llama-server --parallel.
+Replies are fixed JSON, so timings measure the pipeline, not the model.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EXTRACTION = {
+    "summary": "A driver died after a two-vehicle crash.",
+    "location": "Interstate 26",
+    "cause": "unknown",
+}
+BLOG = (
+    "A two-vehicle crash left one person dead early Tuesday, authorities said.\n\n"
+    "Troopers said the pickup crossed the center line before the collision.\n\n"
+    "The driver was charged, and the Highway Patrol is investigating."
+)
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, obj, status=200):
+        out = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        if self.path == "/props":
+            self._send_json({"total_slots": self.server.slots})
+        elif self.path == "/health":
+            self._send_json({"status": "ok"})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path == "/tokenize":
+            # ~4 characters per token, like English text under most tokenizers
+            self._send_json({"tokens": list(range(len(body.get("content", "")) // 4))})
+            return
+        if self.path != "/v1/chat/completions":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        self.server.count_request()
+        content = self._reply(body)
+        with self.server.slot_semaphore:
+            time.sleep(self.server.prompt_latency)
+            if body.get("stream"):
+                self._stream(content)
+            else:
+                time.sleep(self.server.token_latency * len(content.split()))
+                self._send_json({"choices": [{"message": {"content": content}, "finish_reason": "stop"}]})
+
+    def _reply(self, body):
+        if body.get("response_format"):
+            return json.dumps(dict(EXTRACTION, blog_summary=BLOG))
+        system = body.get("messages", [{}])[0].get("content", "")
+        if "blog summaries" in system:
+            return BLOG
+        return json.dumps(EXTRACTION)
+
+    def _stream(self, content):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+        try:
+            for word in content.split(" "):
+                time.sleep(self.server.token_latency)
+                event = {"choices": [{"delta": {"content": word + " "}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client stopped early, as the pipeline does after a JSON object
+        self.close_connection = True
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, prompt_latency=0.0, token_latency=0.0, slots=1):
+        super().__init__(address, StubLLMHandler)
+        self.prompt_latency = prompt_latency
+        self.token_latency = token_latency
+        self.slots = slots
+        self.slot_semaphore = threading.BoundedSemaphore(slots)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_in_thread(**kwargs):
+    """Start a stub on a free local port; returns the server (see .url)."""
+    server = StubLLMServer(("127.0.0.1", 0), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub llama-server for benchmarks")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--prompt-latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="seconds per output word")
+    parser.add_argument("--slots", type=int, default=1, help="completions served at once")
+    args = parser.parse_args(argv)
+
+    server = StubLLMServer(
+        ("127.0.0.1", args.port), args.prompt_latency, args.token_latency, args.slots
+    )
+    print(f"Stub LLM server on {server.url} ({args.slots} slots)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
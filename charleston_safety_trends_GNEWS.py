@@ -1,35 +1,73 @@
 import json
 import logging
-import requests
 from datetime import datetime, timedelta, timezone
-from google import genai
-from google.genai import types
 import os
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart 
-import ollama
 import re 
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 from collections import defaultdict 
+import threading
+import time
+import sqlite3
+import hashlib
+import socket
+import signal
+import sys
+import argparse
+import codecs
+import importlib.util
+import itertools
+import queue
+from contextlib import contextmanager
+from urllib.parse import urlparse
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_PATH = os.path.join(SCRIPT_DIR,"Json_Resources","cred.json")
-with open(JSON_PATH, "r") as f:
-    conf = json.load(f)
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
 
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
 
-GNEWS_API_KEY = conf["GNEWS_API_KEY"]
-GEMINI_API_KEY = conf["GEMINI_API_KEY"]
-EMAIL_FROM = conf["FROM_EMAIL"]
-EMAIL_TO = conf["TO_EMAIL"]
-EMAIL_PASSWORD = conf["APP_PASSWORD"]
+# Heavy dependencies (requests, bs4, lxml, playwright, ollama, google.genai,
+# smtplib) are imported inside the functions that use them, and cred.json is read on
+# first use, so importing this module is fast and needs no credentials.
+
+_conf = None
+_conf_lock = threading.Lock()
+
+def get_conf():
+    """Contents of Json_Resources/cred.json, loaded once on first use."""
+    global _conf
+    with _conf_lock:
+        if _conf is None:
+            with open(JSON_PATH, "r") as f:
+                _conf = json.load(f)
+        return _conf
+
+# Old module-level names, now resolved from cred.json when first accessed
+_CONF_ALIASES = {
+    "conf": None,
+    "GNEWS_API_KEY": "GNEWS_API_KEY",
+    "GEMINI_API_KEY": "GEMINI_API_KEY",
+    "EMAIL_FROM": "FROM_EMAIL",
+    "EMAIL_TO": "TO_EMAIL",
+    "EMAIL_PASSWORD": "APP_PASSWORD",
+}
+
+def __getattr__(name):
+    if name in _CONF_ALIASES:
+        key = _CONF_ALIASES[name]
+        return get_conf() if key is None else get_conf()[key]
+    if name == "client":
+        return get_gemini_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def setting(name, default):
+    """Optional override for a tunable from cred.json, else `default`."""
+    try:
+        return get_conf().get(name, default)
+    except OSError:
+        return default
 
 
 ALLOWED_DOMAINS = [
@@ -51,8 +89,148 @@ ALLOWED_DOMAINS = [
 # Build domain filter for GNews
 DOMAIN_FILTER = ",".join(ALLOWED_DOMAINS)
 
-# Initialize Gemini client
-client = genai.Client(api_key=GEMINI_API_KEY)
+# Gemini client, created the first time gemini_extract needs it
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+def get_gemini_client():
+    global _gemini_client
+    with _gemini_client_lock:
+        if _gemini_client is None:
+            from google import genai
+            _gemini_client = genai.Client(api_key=get_conf()["GEMINI_API_KEY"])
+        return _gemini_client
+
+# -----------------------------
+# CONCURRENCY SETTINGS
+# -----------------------------
+
+# Max articles processed per run (None = no cap)
+MAX_ARTICLES = 30
+
+# Worker threads used by run_test_pipeline (1 = old sequential behaviour).
+# Raised to twice the llama-server slot count so every slot has an article
+# ready while the others are still being fetched.
+ARTICLE_WORKERS = 4
+
+# Max concurrent calls per stage, shared by all workers
+STAGE_LIMITS = {
+    "fetch": 4,        # requests + BeautifulSoup page fetches
+    "playwright": 2,   # headless Chromium fetches
+    "llm": 2,          # Ollama / Gemini calls
+    "llama_server": 2, # in-flight llama-server completions, see llama_server_slots()
+}
+
+_stage_semaphores = {
+    stage: threading.BoundedSemaphore(limit)
+    for stage, limit in STAGE_LIMITS.items()
+}
+
+def set_stage_limit(stage, limit):
+    """Resize a stage's limit; only call while no worker holds a slot."""
+    STAGE_LIMITS[stage] = limit
+    _stage_semaphores[stage] = threading.BoundedSemaphore(limit)
+
+@contextmanager
+def stage_slot(stage):
+    """Block until a slot for `stage` is free (see STAGE_LIMITS)."""
+    sem = _stage_semaphores.get(stage)
+    if sem is None:
+        yield
+        return
+    with sem:
+        yield
+
+# -----------------------------
+# HTTP CLIENT
+# -----------------------------
+
+HTTP_CONNECT_TIMEOUT = 5      # seconds
+HTTP_READ_TIMEOUT = 30        # seconds, page + GNews requests
+LLM_READ_TIMEOUT = 300        # seconds, CPU inference is slow
+HTTP_RETRIES = 3              # retries on connection errors, 429 and 5xx
+HTTP_BACKOFF_FACTOR = 0.5     # 0.5s, 1s, 2s ... between retries
+HTTP_POOL_SIZE = 10           # keep-alive connections kept per host
+
+def _accept_encoding():
+    # urllib3 only decodes brotli when one of these is installed
+    for module in ("brotli", "brotlicffi"):
+        if importlib.util.find_spec(module) is not None:
+            return "gzip, deflate, br"
+    return "gzip, deflate"
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Shared requests.Session: per-host keep-alive pools plus retry with backoff."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=HTTP_RETRIES,
+                # Connect errors and 429/5xx only. A read timeout means the
+                # server is still working; resending would queue the same
+                # prompt again and multiply the caller's timeout.
+                read=0,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,  # LLM POSTs are safe to repeat
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": "Mozilla/5.0",
+                "Accept-Encoding": _accept_encoding(),
+            })
+            _http_session = session
+        return _http_session
+
+def http_get(url, timeout=None, **kwargs):
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    return get_http_session().get(url, timeout=timeout, **kwargs)
+
+def http_post(url, timeout=None, **kwargs):
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
+    return get_http_session().post(url, timeout=timeout, **kwargs)
+
+# -----------------------------
+# LLM BACKEND SETTINGS
+# -----------------------------
+# Each of these can be overridden by the same key in cred.json.
+
+LLAMA_SERVER_URL = "http://localhost:8081"
+LLAMA_SERVER_MODEL = "qwen2.5-0.5b-instruct-q2_k.gguf"
+OLLAMA_HOST = "http://localhost:11434"
+OLLAMA_MODEL = "qwen2:0.5b"
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+
+# Extraction backends in the order they are tried
+# ("LLM_BACKEND_CHAIN" in cred.json; per-backend timeouts in "LLM_BACKEND_TIMEOUTS")
+LLM_BACKEND_CHAIN = ["llama_server", "ollama", "gemini"]
+
+# Prompt type -> llama-server slot to pin it to ("LLAMA_SERVER_SLOTS" in
+# cred.json), e.g. {"llama_server_extract": 0, "qwen_blog_summary": 1}.
+# Empty lets the server pick the slot with the most similar cached prompt.
+LLAMA_SERVER_SLOTS = {}
+
+# Skip a backend for CIRCUIT_COOLDOWN_SECONDS after this many failures in a row
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN_SECONDS = 300
 
 # -----------------------------
 # LOGGING SETUP
@@ -64,7 +242,330 @@ logging.basicConfig(
 )
 
 def log_response(label, data):
-    logging.info(f"{label}:\n{json.dumps(data, indent=2)}")
+    """One-line summary at INFO; the full payload only when DEBUG is on."""
+    articles = data.get("articles") if isinstance(data, dict) else None
+    if articles is not None:
+        logging.info(f"{label}: {len(articles)} articles of {data.get('totalArticles', '?')}")
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"{label}: {json.dumps(data, separators=(',', ':'))}")
+
+# -----------------------------
+# RUN METRICS
+# -----------------------------
+
+RUN_REPORT_PATH = os.path.join(CACHE_DIR, "run_report.json")
+
+# node_exporter textfile collector target ("PROMETHEUS_TEXTFILE" in
+# cred.json), e.g. /var/lib/node_exporter/textfile/crash_news.prom
+PROMETHEUS_TEXTFILE = None
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-q * len(sorted_values) // 1)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def _latency_summary(seconds):
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "total_s": round(sum(values), 3),
+        "p50_ms": round(_percentile(values, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1),
+    }
+
+class RunMetrics:
+    """
+    Timing spans and counters for one run, overall and per news domain.
+    Spans that raise count as failures of their stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.spans = defaultdict(list)
+            self.domain_spans = defaultdict(lambda: defaultdict(list))
+            self.counters = defaultdict(int)
+            self.domain_counters = defaultdict(lambda: defaultdict(int))
+
+    @contextmanager
+    def span(self, stage, domain=None):
+        profiler = PROFILER
+        if profiler is not None and profiler.wants(stage):
+            profiler.enter(stage)
+        else:
+            profiler = None
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(f"{stage}_failures", domain=domain)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.exit()
+            with self._lock:
+                self.spans[stage].append(elapsed)
+                if domain:
+                    self.domain_spans[domain][stage].append(elapsed)
+
+    def count(self, name, n=1, domain=None):
+        with self._lock:
+            self.counters[name] += n
+            if domain:
+                self.domain_counters[domain][name] += n
+
+    def report(self):
+        with self._lock:
+            counters = dict(self.counters)
+            counters["llm_cache_hits"] = LLM_CACHE.hits
+            counters["llm_cache_misses"] = LLM_CACHE.misses
+            return {
+                "started": datetime.fromtimestamp(self.started, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "duration_s": round(time.time() - self.started, 3),
+                "stages": {k: _latency_summary(v) for k, v in sorted(self.spans.items())},
+                "domains": {
+                    domain: {
+                        "stages": {
+                            k: _latency_summary(v)
+                            for k, v in sorted(self.domain_spans.get(domain, {}).items())
+                        },
+                        "counters": dict(self.domain_counters.get(domain, {})),
+                    }
+                    for domain in sorted(self.domain_spans.keys() | self.domain_counters.keys())
+                },
+                "counters": dict(sorted(counters.items())),
+            }
+
+    def write(self, path=RUN_REPORT_PATH, prometheus_path=None):
+        """JSON report to `path`; Prometheus text format to `prometheus_path` if given."""
+        report = self.report()
+        _write_atomic(path, json.dumps(report, indent=2))
+        if prometheus_path:
+            _write_atomic(prometheus_path, _prometheus_text(report))
+        return report
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def _prometheus_text(report):
+    # Values describe the last run only, so everything is a gauge
+    lines = [
+        "# TYPE crash_news_stage_seconds gauge",
+        "# TYPE crash_news_stage_time_seconds gauge",
+        "# TYPE crash_news_stage_calls gauge",
+    ]
+    for stage, summary in report["stages"].items():
+        label = f'stage="{stage}"'
+        lines.append(f'crash_news_stage_seconds{{{label},quantile="0.5"}} {summary["p50_ms"] / 1000}')
+        lines.append(f'crash_news_stage_seconds{{{label},quantile="0.95"}} {summary["p95_ms"] / 1000}')
+        lines.append(f'crash_news_stage_time_seconds{{{label}}} {summary["total_s"]}')
+        lines.append(f'crash_news_stage_calls{{{label}}} {summary["count"]}')
+    lines.append("# TYPE crash_news_events gauge")
+    for name, value in report["counters"].items():
+        lines.append(f'crash_news_events{{name="{name}"}} {value}')
+    lines.append("# TYPE crash_news_run_duration_seconds gauge")
+    lines.append(f"crash_news_run_duration_seconds {report['duration_s']}")
+    lines.append("# TYPE crash_news_last_run_timestamp_seconds gauge")
+    lines.append(f"crash_news_last_run_timestamp_seconds {int(time.time())}")
+    return "\n".join(lines) + "\n"
+
+METRICS = RunMetrics()
+
+# -----------------------------
+# OPT-IN PROFILING
+# -----------------------------
+# Off unless CRASH_NEWS_PROFILE is set (or --profile is passed): "1"/"all"
+# profiles every METRICS span, or give a comma-separated list of stages,
+# e.g. CRASH_NEWS_PROFILE=parse,facts. When off, spans only test
+# `PROFILER is not None`.
+
+PROFILE_ENV = "CRASH_NEWS_PROFILE"
+PROFILE_DIR = os.path.join(CACHE_DIR, "profile")
+PROFILE_SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+PROFILE_TOP_ALLOCATIONS = 25      # lines per stage in the allocation tables
+PROFILE_SNAPSHOT_CALLS = 3        # calls per stage that get tracemalloc snapshots
+
+PROFILER = None
+
+class StageProfiler:
+    """
+    Sampling CPU profile and tracemalloc accounting per METRICS stage.
+
+    A background thread samples the stacks of threads inside a profiled span
+    and files them under the innermost stage, giving collapsed stacks for
+    flamegraph.pl / speedscope. Every span records net growth and peak of
+    traced memory; the first PROFILE_SNAPSHOT_CALLS spans of each stage also
+    diff tracemalloc snapshots for per-line allocation tables (snapshots are
+    slow, and the profiler's own work is kept out of the samples). Nested
+    spans are fine; the pipeline runs articles one at a time while profiling
+    so the numbers of concurrent spans don't mix.
+    """
+
+    def __init__(self, stages=None, interval=PROFILE_SAMPLE_INTERVAL):
+        self.stages = set(stages) if stages else None   # None = every stage
+        self.interval = interval
+        self._active = {}   # thread id -> stack of open span records
+        self._paused = set()   # threads busy in enter()/exit(), not sampled
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self.samples = defaultdict(lambda: defaultdict(int))
+        self.allocations = defaultdict(lambda: defaultdict(int))
+        self.peak_bytes = defaultdict(int)
+        self.net_bytes = defaultdict(int)
+        self.calls = defaultdict(int)
+
+    def wants(self, stage):
+        return self.stages is None or stage in self.stages
+
+    def start(self):
+        import tracemalloc
+
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        import tracemalloc
+
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        tracemalloc.stop()
+
+    # Allocations made by the profiler itself or by imports, not the stage
+    IGNORED_ALLOCATION_FILES = ("tracemalloc.py", "<frozen importlib._bootstrap")
+
+    def enter(self, stage):
+        import tracemalloc
+
+        tid = threading.get_ident()
+        self._paused.add(tid)
+        stack = self._active.setdefault(tid, [])
+        with self._lock:
+            snapshot_wanted = self.calls[stage] < PROFILE_SNAPSHOT_CALLS
+            self.calls[stage] += 1
+        snapshot = tracemalloc.take_snapshot() if snapshot_wanted else None
+
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        stack.append({"stage": stage, "base": current, "peak": current, "snapshot": snapshot})
+        self._paused.discard(tid)
+
+    def exit(self):
+        import tracemalloc
+
+        tid = threading.get_ident()
+        self._paused.add(tid)
+        stack = self._active[tid]
+        record = stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(record["peak"], peak)
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        diff = []
+        if record["snapshot"] is not None:
+            diff = tracemalloc.take_snapshot().compare_to(record["snapshot"], "lineno")
+
+        stage = record["stage"]
+        with self._lock:
+            self.peak_bytes[stage] = max(self.peak_bytes[stage], peak - record["base"])
+            self.net_bytes[stage] += current - record["base"]
+            table = self.allocations[stage]
+            for stat in diff:
+                frame = stat.traceback[0]
+                if stat.size_diff > 0 and not any(
+                    name in frame.filename for name in self.IGNORED_ALLOCATION_FILES
+                ):
+                    table[f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+        self._paused.discard(tid)
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid, stack in list(self._active.items()):
+                if tid == own or not stack or tid in self._paused:
+                    continue
+                frame = frames.get(tid)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stage = stack[-1]["stage"]
+                with self._lock:
+                    self.samples[stage][";".join(reversed(names))] += 1
+
+    def write(self, out_dir):
+        """<stage>.folded, <stage>.alloc.txt and summary.json in `out_dir`."""
+        os.makedirs(out_dir, exist_ok=True)
+        summary = {}
+        with self._lock:
+            for stage in sorted(self.calls.keys() | self.samples.keys()):
+                stacks = self.samples.get(stage, {})
+                with open(os.path.join(out_dir, f"{stage}.folded"), "w") as f:
+                    for stack, n in sorted(stacks.items(), key=lambda kv: -kv[1]):
+                        f.write(f"{stack} {n}\n")
+
+                top = sorted(self.allocations[stage].items(), key=lambda kv: -kv[1])
+                with open(os.path.join(out_dir, f"{stage}.alloc.txt"), "w") as f:
+                    f.write(f"{'KiB':>10}  line (allocated during the first "
+                            f"{PROFILE_SNAPSHOT_CALLS} {stage} calls)\n")
+                    for where, size in top[:PROFILE_TOP_ALLOCATIONS]:
+                        f.write(f"{size / 1024:>10.1f}  {where}\n")
+
+                summary[stage] = {
+                    "calls": self.calls[stage],
+                    "samples": sum(stacks.values()),
+                    "sampled_s": round(sum(stacks.values()) * self.interval, 3),
+                    "peak_kib": round(self.peak_bytes[stage] / 1024, 1),
+                    "net_kib": round(self.net_bytes[stage] / 1024, 1),
+                }
+        with open(os.path.join(out_dir, "summary.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+def enable_profiling(spec="all"):
+    """Start profiling the stages named in `spec` ("all", "1" or "parse,facts")."""
+    global PROFILER
+    if PROFILER is not None:
+        return PROFILER
+    stages = None
+    if spec and spec.lower() not in ("1", "all", "true", "yes"):
+        stages = [name.strip() for name in spec.split(",") if name.strip()]
+    PROFILER = StageProfiler(stages)
+    PROFILER.start()
+    logging.info(f"Profiling {'all stages' if stages is None else ', '.join(stages)}")
+    return PROFILER
+
+def finish_profiling():
+    """Stop the profiler and write its output under PROFILE_DIR; returns the directory."""
+    global PROFILER
+    if PROFILER is None:
+        return None
+    profiler, PROFILER = PROFILER, None
+    profiler.stop()
+    out_dir = os.path.join(PROFILE_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+    profiler.write(out_dir)
+    logging.info(f"Profile written to {out_dir}")
+    return out_dir
 
 # ------------------------------
 #  HTML SELECTORS AND PATTERNS
@@ -120,58 +621,82 @@ def remove_author_bio(text):
 
     return "\n".join(cleaned).strip()
 
-def extract_author_name(soup):
+# Byline containers, most specific first
+BYLINE_SELECTORS = [
+    ".author", ".author-name", ".byline", ".byline-name", ".article-author",
+    ".story-author", ".post-author", ".c-article__author", ".article__byline",
+    ".meta-author", ".article-meta-author", ".author-block span",
+    ".article-byline", ".story-byline", ".article-header__author"
+]
+
+def _byline_name(text):
+    """Name from a byline element's text, if it looks like 2–4 words."""
+    if text and 2 <= len(text.split()) <= 4:
+        return text
+    return None
+
+def _by_prefix_name(text):
+    """Name from a "By John Doe" string."""
+    t = text.strip()
+    if t.lower().startswith("by "):
+        return _byline_name(t[3:].strip())
+    return None
+
+def _top_name(t):
+    """Short capitalized name-like text near the top of a page."""
+    if not t:
+        return None
+
+    # Skip long text blocks
+    if len(t) > 60:
+        return None
+
+    # Look for capitalized name-like patterns
+    words = t.split()
+    if 2 <= len(words) <= 4 and all(w[0].isupper() for w in words if w.isalpha()):
+        # Avoid grabbing dates or locations
+        if any(x.lower() in t.lower() for x in ["updated", "published", "charleston", "south carolina"]):
+            return None
+        return t
+    return None
+
+def _find_author(soup, preferred=None):
     """
-    Attempts to extract an author/reporter name from a wide range of news sites.
-    Covers Live5News, ABC4, CountOn2, Post & Courier, The State, Greenville Online,
-    Greenville Journal, WYFF4, FOX Carolina, WSPA, WGOG, WSNW, WLOS, etc.
+    Returns (name, byline selector that produced it). `preferred` (a
+    domain's learned byline selector) is tried before the full list.
     """
 
     # 1. Known site-specific selectors
-    selectors = [
-        ".author", ".author-name", ".byline", ".byline-name", ".article-author",
-        ".story-author", ".post-author", ".c-article__author", ".article__byline",
-        ".meta-author", ".article-meta-author", ".author-block span",
-        ".article-byline", ".story-byline", ".article-header__author"
-    ]
-
+    selectors = ([preferred] if preferred else []) + BYLINE_SELECTORS
     for sel in selectors:
         el = soup.select_one(sel)
         if el:
-            name = el.get_text(strip=True)
-            if name and 2 <= len(name.split()) <= 4:
-                return name
+            name = _byline_name(el.get_text(strip=True))
+            if name:
+                return name, sel
 
     # 2. Look for "By John Doe" patterns anywhere in the HTML
-    possible = soup.find_all(string=True)
-    for text in possible:
-        t = text.strip()
-        if t.lower().startswith("by "):
-            name = t[3:].strip()
-            if 2 <= len(name.split()) <= 4:
-                return name
+    for text in soup.find_all(string=True):
+        name = _by_prefix_name(text)
+        if name:
+            return name, None
 
     # 3. Look for short capitalized names near the top of the article
     #    (common on Live5News, ABC4, WYFF4, etc.)
-    top_candidates = soup.find_all(["p", "span", "div"], limit=10)
-    for el in top_candidates:
-        t = el.get_text(strip=True)
-        if not t:
-            continue
+    for el in soup.find_all(["p", "span", "div"], limit=10):
+        name = _top_name(el.get_text(strip=True))
+        if name:
+            return name, None
 
-        # Skip long text blocks
-        if len(t) > 60:
-            continue
-
-        # Look for capitalized name-like patterns
-        words = t.split()
-        if 2 <= len(words) <= 4 and all(w[0].isupper() for w in words if w.isalpha()):
-            # Avoid grabbing dates or locations
-            if any(x.lower() in t.lower() for x in ["updated", "published", "charleston", "south carolina"]):
-                continue
-            return t
+    return None, None
 
-    return None
+def extract_author_name(soup):
+    """
+    Attempts to extract an author/reporter name from a wide range of news sites.
+    Covers Live5News, ABC4, CountOn2, Post & Courier, The State, Greenville Online,
+    Greenville Journal, WYFF4, FOX Carolina, WSPA, WGOG, WSNW, WLOS, etc.
+    """
+    return _find_author(soup)[0]
 
 def remove_byline(paragraphs):
     if not paragraphs:
@@ -199,10 +724,169 @@ def remove_byline(paragraphs):
         return paragraphs[1:]
 
     return paragraphs
+# -----------------------------
+# PER-DOMAIN EXTRACTION PROFILES
+# -----------------------------
+
+DOMAIN_PROFILES_PATH = os.path.join(CACHE_DIR, "domain_profiles.json")
+
+class DomainProfiles:
+    """
+    What worked last time for each news domain: the article container
+    selector, the byline selector and the fetch method ("static" or
+    "playwright"). Fetchers try the recorded values first and overwrite
+    them when they stop working. Persisted as JSON between runs.
+    """
+
+    def __init__(self, path=DOMAIN_PROFILES_PATH):
+        self.path = path
+        self._profiles = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._profiles = json.load(f)
+            except (OSError, ValueError):
+                self._profiles = {}
+        return self._profiles
+
+    def get(self, domain):
+        with self._lock:
+            return dict(self._load().get(domain, {}))
+
+    def update(self, domain, **fields):
+        """Set profile fields; a None value forgets that field."""
+        with self._lock:
+            profile = self._load().setdefault(domain, {})
+            for key, value in fields.items():
+                if value is None:
+                    if key in profile:
+                        del profile[key]
+                        self._dirty = True
+                elif profile.get(key) != value:
+                    profile[key] = value
+                    self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._profiles, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+DOMAIN_PROFILES = DomainProfiles()
+
 # -----------------------------
 # REGEX FACT EXTRACTOR
 # -----------------------------
 
+# 2–4 capitalized tokens, shared by most of the patterns below
+NAME = r"[A-Z][a-z]+(?: [A-Z][a-z]+){1,3}"
+
+QUOTE_RE = re.compile(r"“([^”]+)”")
+DATE_FULL_RE = re.compile(r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2}, \d{4}")
+DATE_MD_RE = re.compile(r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2}")
+TIME_RE = re.compile(r"\b\d{1,2}:\d{2}\s*(?:a\.m\.|p\.m\.)")
+SPEED_RE = re.compile(r"(\d+)\s*mph")
+
+# e.g. "Tiasia Monique Newton, 22;" or "Roger Anibal Cardona Lopez, 26,"
+NAME_AGE_RE = re.compile(rf"({NAME}),?\s*(?:now\s*)?(\d{{1,2}})\b")
+OFFICIAL_RE = re.compile(r"\b(Solicitor|Assistant Solicitor|Judge|Sheriff|Officer|Detective|Cpl\.|Coroner)\s+([A-Z][a-z]+(?: [A-Z][a-z]+){0,2})")
+FAMILY_RE = re.compile(rf"\b(mother|father|sister|brother|son|daughter|cousin|aunt|uncle|grandmother|grandfather)\s+of\s+({NAME})", re.IGNORECASE)
+
+# e.g. "Tiasia Monique Newton, 22; Danielle Shon Branton, 29; and Reshana Simone Lambright, 32;"
+VICTIM_LIST_RE = re.compile(rf"((?:{NAME},\s*\d{{1,2}}\s*;?\s*(?:and\s*)?)+)")
+VICTIM_PAIR_RE = re.compile(rf"({NAME}),\s*(\d{{1,2}})")
+VICTIM_SINGLE_RE = re.compile(rf"({NAME}),\s*(\d{{1,2}})\s*;?.{{0,80}}?(?:died|killed|lost their lives)", re.IGNORECASE | re.DOTALL)
+
+SUSPECT_RE = re.compile(rf"({NAME}),\s*(\d{{1,2}}),\s+is charged with\s+([^\.]+)\.")
+CHARGE_SPLIT_RE = re.compile(r",\s*| and ")
+ARRESTED_RE = re.compile(rf"(?:arrested\s+({NAME})|({NAME})\s+was arrested)")
+
+DRIVING_RE = re.compile(rf"({NAME}).{{0,40}}?\bwas driving\b")
+EJECTED_RE = re.compile(rf"({NAME}).{{0,80}}?ejected from driver", re.IGNORECASE)
+SUV_RE = re.compile(rf"({NAME})[’']s SUV")
+PASSENGER_RE = re.compile(rf"({NAME}).{{0,40}}?\bpassenger\b", re.IGNORECASE)
+
+# The gap is bounded so a long run of text without a period stays linear
+SENTENCE_STRICT_RE = re.compile(r"sentenced[^\.]{0,200}?\bto\s+(\d+)\s+(?:years|year)", re.IGNORECASE)
+SENTENCE_LOOSE_RE = re.compile(r"(?<!could have been )sentenced[^\.]{0,200}?(\d+)\s+(?:years|year)", re.IGNORECASE)
+
+# Literal keywords each loose pattern must end on (same flags as the pattern)
+VICTIM_SINGLE_ANCHOR_RE = re.compile(r"died|killed|lost their lives", re.IGNORECASE)
+SUSPECT_ANCHOR_RE = re.compile(r"is charged with")
+ARRESTED_ANCHOR_RE = re.compile(r"arrested")
+DRIVING_ANCHOR_RE = re.compile(r"was driving")
+EJECTED_ANCHOR_RE = re.compile(r"ejected from driver", re.IGNORECASE)
+SUV_ANCHOR_RE = re.compile(r"[’']s SUV")
+PASSENGER_ANCHOR_RE = re.compile(r"passenger", re.IGNORECASE)
+
+# How far a name (plus the gap allowed by its pattern) may sit from its keyword
+FACT_WINDOW_CHARS = 200
+
+# Hard ceiling on text scanned for facts; far longer than any news article
+MAX_FACT_TEXT_CHARS = 100_000
+
+def _anchor_windows(anchor_re, text, before=FACT_WINDOW_CHARS,
+                    after=FACT_WINDOW_CHARS, until=None):
+    """
+    Merged [lo, hi) spans around each keyword hit. With `until`, a span ends
+    just past the next `until` character instead (and hits without one are
+    dropped, since the pattern needs it).
+    """
+    windows = []
+    for m in anchor_re.finditer(text):
+        lo = max(0, m.start() - before)
+        if until is None:
+            hi = min(len(text), m.end() + after)
+        else:
+            stop = text.find(until, m.end())
+            if stop == -1:
+                continue
+            hi = stop + 1
+        if windows and lo <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], hi)
+        else:
+            windows.append([lo, hi])
+    return windows
+
+def _windowed_search(pattern, text, windows, pos=0):
+    """
+    Same result as pattern.search(text, pos), but only scans the keyword
+    windows. Each window hit is re-matched against the full text so window
+    edges can't change the answer.
+    """
+    for lo, hi in windows:
+        if hi <= pos:
+            continue
+        start = max(lo, pos)
+        while True:
+            m = pattern.search(text, start, hi)
+            if m is None:
+                break
+            full = pattern.match(text, m.start())
+            if full:
+                return full
+            start = m.start() + 1
+    return None
+
+def _windowed_finditer(pattern, text, windows):
+    """Same matches as pattern.finditer(text), restricted to the keyword windows."""
+    pos = 0
+    while True:
+        m = _windowed_search(pattern, text, windows, pos)
+        if m is None:
+            return
+        yield m
+        pos = m.end() if m.end() > m.start() else m.start() + 1
+
 def extract_structured_facts(text):
     facts = {
         "people": [],
@@ -218,6 +902,7 @@ def extract_structured_facts(text):
         "suspect": None
     }
 
+    text = text[:MAX_FACT_TEXT_CHARS]
     lower_text = text.lower()
 
     # --- HELPERS ---
@@ -230,17 +915,12 @@ def extract_structured_facts(text):
             lst.append(item)
 
     # --- QUOTES ---
-    quote_pattern = r"“([^”]+)”"
-    facts["quotes"] = re.findall(quote_pattern, text)
+    facts["quotes"] = QUOTE_RE.findall(text)
 
     # --- DATES & TIMES ---
-    date_pattern_full = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2}, \d{4}"
-    date_pattern_md = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2}"
-    time_pattern = r"\b\d{1,2}:\d{2}\s*(?:a\.m\.|p\.m\.)"
-
-    dates = set(re.findall(date_pattern_full, text))
-    dates.update(re.findall(date_pattern_md, text))
-    dates.update(re.findall(time_pattern, text))
+    dates = set(DATE_FULL_RE.findall(text))
+    dates.update(DATE_MD_RE.findall(text))
+    dates.update(TIME_RE.findall(text))
     facts["dates"] = list(dates)
 
     # --- CRASH DETAILS ---
@@ -254,43 +934,15 @@ def extract_structured_facts(text):
             unique_append(facts["crash_details"], kw)
 
     # speed
-    speed_pattern = r"(\d+)\s*mph"
-    for m in re.findall(speed_pattern, lower_text):
+    for m in SPEED_RE.findall(lower_text):
         unique_append(facts["crash_details"], f"{m} mph")
 
-    # --- NAMES (broad) ---
-    # 2–4 capitalized tokens
-    name_pattern = r"\b([A-Z][a-z]+(?: [A-Z][a-z]+){1,3})\b"
-    raw_names = set(re.findall(name_pattern, text))
-
-    # Filter out obvious non-persons
-    blacklist_first = {
-        "CHARLESTON", "NORTH", "SOUTH", "Monday", "Tuesday", "Wednesday",
-        "Thursday", "Friday", "Saturday", "Sunday", "Copyright"
-    }
-    names = set()
-    for n in raw_names:
-        first = n.split()[0]
-        if first.upper() in blacklist_first:
-            continue
-        names.add(normalize_name(n))
-
-    # --- AGES ---
-    ages_simple_pattern = r"\b(\d{1,2})\s*(?:years?\s*old|year-old)"
-    ages_now_pattern = r"now\s+(\d{1,2})\b"
-    ages_trailing_pattern = r"\b(\d{1,2})\s*[,;]"
-
-    ages = set(re.findall(ages_simple_pattern, text))
-    ages.update(re.findall(ages_now_pattern, text))
-    ages.update(re.findall(ages_trailing_pattern, text))
-
     # --- NAME + AGE PAIRS ---
-    # e.g. "Tiasia Monique Newton, 22;" or "Roger Anibal Cardona Lopez, 26,"
-    name_age_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}),?\s*(?:now\s*)?(\d{1,2})\b"
-    name_age_pairs = []
-    for name, age in re.findall(name_age_pattern, text):
-        name_norm = normalize_name(name)
-        name_age_pairs.append((name_norm, int(age)))
+    # Computed once; feeds "people" and the suspect's age below
+    name_age_pairs = [
+        (normalize_name(name), int(age))
+        for name, age in NAME_AGE_RE.findall(text)
+    ]
 
     # Add to people
     seen_people = set()
@@ -301,49 +953,47 @@ def extract_structured_facts(text):
             seen_people.add(key)
 
     # --- OFFICIALS ---
-    official_pattern = r"\b(Solicitor|Assistant Solicitor|Judge|Sheriff|Officer|Detective|Cpl\.|Coroner)\s+([A-Z][a-z]+(?: [A-Z][a-z]+){0,2})"
-    for title, name in re.findall(official_pattern, text):
+    for title, name in OFFICIAL_RE.findall(text):
         name_norm = normalize_name(name)
         facts["officials"].append({"title": title.replace("Cpl.", "Cpl"), "name": name_norm})
 
     # --- FAMILY MEMBERS ---
-    family_pattern = r"\b(mother|father|sister|brother|son|daughter|cousin|aunt|uncle|grandmother|grandfather)\s+of\s+([A-Z][a-z]+(?: [A-Z][a-z]+){1,3})"
-    for relation, person in re.findall(family_pattern, text, re.IGNORECASE):
+    for relation, person in FAMILY_RE.findall(text):
         facts["family_members"].append({
             "relation": relation.lower(),
             "to": normalize_name(person)
         })
 
+    # The loose "NAME ... keyword" patterns below only run in windows around
+    # their keyword, so long articles can't make them backtrack over the
+    # whole text.
+
     # --- VICTIM LISTS ---
-    # e.g. "Tiasia Monique Newton, 22; Danielle Shon Branton, 29; and Reshana Simone Lambright, 32;"
-    victim_list_pattern = r"((?:[A-Z][a-z]+(?: [A-Z][a-z]+){1,3},\s*\d{1,2}\s*;?\s*(?:and\s*)?)+)"
-    for block in re.findall(victim_list_pattern, text):
-        pair_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}),\s*(\d{1,2})"
-        for name, age in re.findall(pair_pattern, block):
-            name_norm = normalize_name(name)
-            victim_entry = {"name": name_norm, "age": int(age)}
+    for block in VICTIM_LIST_RE.findall(text):
+        for name, age in VICTIM_PAIR_RE.findall(block):
+            victim_entry = {"name": normalize_name(name), "age": int(age)}
             if victim_entry not in facts["victims"]:
                 facts["victims"].append(victim_entry)
 
     # Also catch single victims with "lost their lives", "were killed", etc.
-    victim_single_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}),\s*(\d{1,2})\s*;?.{0,80}?(?:died|killed|lost their lives)"
-    for name, age in re.findall(victim_single_pattern, text, re.IGNORECASE | re.DOTALL):
-        name_norm = normalize_name(name)
-        victim_entry = {"name": name_norm, "age": int(age)}
+    windows = _anchor_windows(VICTIM_SINGLE_ANCHOR_RE, text, after=0)
+    for m in _windowed_finditer(VICTIM_SINGLE_RE, text, windows):
+        name, age = m.groups()
+        victim_entry = {"name": normalize_name(name), "age": int(age)}
         if victim_entry not in facts["victims"]:
             facts["victims"].append(victim_entry)
 
     # --- SUSPECT DETECTION ---
     # Pattern: "NAME, 26, is charged with ..."
-    suspect_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}),\s*(\d{1,2}),\s+is charged with\s+([^\.]+)\."
-    suspect_match = re.search(suspect_pattern, text)
+    windows = _anchor_windows(SUSPECT_ANCHOR_RE, text, until=".")
+    suspect_match = _windowed_search(SUSPECT_RE, text, windows)
     suspect = None
     if suspect_match:
         s_name = normalize_name(suspect_match.group(1))
         s_age = int(suspect_match.group(2))
         charges_text = suspect_match.group(3)
         # split charges by "and" and commas
-        parts = re.split(r",\s*| and ", charges_text)
+        parts = CHARGE_SPLIT_RE.split(charges_text)
         charges = [p.strip() for p in parts if p.strip()]
         suspect = {
             "name": s_name,
@@ -354,8 +1004,8 @@ def extract_structured_facts(text):
 
     # Fallback suspect: "NAME ... was arrested" or "police arrested NAME"
     if not suspect:
-        arrested_pattern = r"(?:arrested\s+([A-Z][a-z]+(?: [A-Z][a-z]+){1,3})|([A-Z][a-z]+(?: [A-Z][a-z]+){1,3})\s+was arrested)"
-        m = re.search(arrested_pattern, text)
+        windows = _anchor_windows(ARRESTED_ANCHOR_RE, text)
+        m = _windowed_search(ARRESTED_RE, text, windows)
         if m:
             name_candidate = m.group(1) or m.group(2)
             s_name = normalize_name(name_candidate)
@@ -378,22 +1028,23 @@ def extract_structured_facts(text):
     driver = None
 
     # explicit "NAME, 24, was driving" or "NAME was driving"
-    driver_pattern1 = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}).{0,40}?\bwas driving\b"
-    m = re.search(driver_pattern1, text)
+    # (one extra char after the keyword so the trailing \b sees real text)
+    windows = _anchor_windows(DRIVING_ANCHOR_RE, text, after=1)
+    m = _windowed_search(DRIVING_RE, text, windows)
     if m:
         driver = normalize_name(m.group(1))
 
     # "ejected from driver’s seat" near a name
     if not driver:
-        ejected_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}).{0,80}?ejected from driver"
-        m = re.search(ejected_pattern, text, re.IGNORECASE)
+        windows = _anchor_windows(EJECTED_ANCHOR_RE, text, after=0)
+        m = _windowed_search(EJECTED_RE, text, windows)
         if m:
             driver = normalize_name(m.group(1))
 
     # "NAME's SUV" or "NAME’s SUV"
     if not driver:
-        suv_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3})[’']s SUV"
-        m = re.search(suv_pattern, text)
+        windows = _anchor_windows(SUV_ANCHOR_RE, text, after=0)
+        m = _windowed_search(SUV_RE, text, windows)
         if m:
             driver = normalize_name(m.group(1))
 
@@ -409,15 +1060,13 @@ def extract_structured_facts(text):
         facts["court"]["plea"] = "guilty"
 
     # Sentence: prefer explicit "sentenced NAME to 10 years"
-    sentence_pattern_strict = r"sentenced[^\.]*?\bto\s+(\d+)\s+(?:years|year)"
-    m_strict = re.search(sentence_pattern_strict, text, re.IGNORECASE)
+    m_strict = SENTENCE_STRICT_RE.search(text)
     sentence_years = None
     if m_strict:
         sentence_years = int(m_strict.group(1))
     else:
         # fallback: any "sentenced ... X years" but avoid "could have been sentenced"
-        sentence_pattern_loose = r"(?<!could have been )sentenced[^\.]*?(\d+)\s+(?:years|year)"
-        m_loose = re.search(sentence_pattern_loose, text, re.IGNORECASE)
+        m_loose = SENTENCE_LOOSE_RE.search(text)
         if m_loose:
             sentence_years = int(m_loose.group(1))
 
@@ -426,26 +1075,217 @@ def extract_structured_facts(text):
 
     # --- PASSENGERS (simple heuristic) ---
     # If text mentions "passenger" with a name
-    passenger_pattern = r"([A-Z][a-z]+(?: [A-Z][a-z]+){1,3}).{0,40}?\bpassenger\b"
-    for name in re.findall(passenger_pattern, text, re.IGNORECASE):
-        name_norm = normalize_name(name)
+    windows = _anchor_windows(PASSENGER_ANCHOR_RE, text, after=1)
+    for m in _windowed_finditer(PASSENGER_RE, text, windows):
+        name_norm = normalize_name(m.group(1))
         if name_norm not in facts["passengers"]:
             facts["passengers"].append(name_norm)
 
     return facts
 
+# -----------------------------
+# BATCH FACT EXTRACTION
+# -----------------------------
+
+# Articles handed to each worker process at a time
+FACT_BATCH_CHUNKSIZE = 16
+# Chunks per process read ahead of the output
+FACT_BATCH_READ_AHEAD = 4
+
+def clean_article_text(text):
+    """GNews truncation marker, byline and author bio stripped from raw article text."""
+    text = re.sub(r"\[\+?\d+\schars\]", "", text or "").strip()
+    lines = remove_byline(text.splitlines())
+    return remove_author_bio("\n".join(lines))
+
+def _facts_for_text(text):
+    return extract_structured_facts(clean_article_text(text))
+
+def extract_facts_batch(texts, processes=None, chunksize=FACT_BATCH_CHUNKSIZE):
+    """
+    Yield extract_structured_facts() for each raw article text, in input
+    order, spreading the regex work over a process pool (one process per
+    core by default; processes=1 runs inline).
+    """
+    if processes == 1:
+        for text in texts:
+            yield _facts_for_text(text)
+        return
+
+    import multiprocessing
+
+    # Pool.imap drains its whole input up front, so hand it a bounded
+    # window at a time to keep memory flat on large backfills
+    texts = iter(texts)
+    window = (processes or os.cpu_count() or 1) * chunksize * FACT_BATCH_READ_AHEAD
+    with multiprocessing.Pool(processes) as pool:
+        while True:
+            batch = list(itertools.islice(texts, window))
+            if not batch:
+                return
+            yield from pool.imap(_facts_for_text, batch, chunksize)
+
+def run_facts_batch(path, processes=None, out=sys.stdout):
+    """
+    Backfill facts for stored articles. `path` is JSON Lines, one article per
+    line with "text" or "content" (GNews records work as-is); writes one
+    {"url", "title", "facts"} line per article to `out` as soon as its
+    facts are ready. The file is read lazily, so its size doesn't matter.
+    """
+    with open(path, "r") as f:
+        articles = (json.loads(line) for line in f if line.strip())
+        # tee only buffers the read-ahead window between input and output
+        keys, texts = itertools.tee(
+            (
+                (art.get("url"), art.get("title")),
+                art.get("text") or art.get("content") or art.get("description") or "",
+            )
+            for art in articles
+        )
+        keys = (key for key, _ in keys)
+        texts = (text for _, text in texts)
+        for (url, title), facts in zip(keys, extract_facts_batch(texts, processes)):
+            out.write(json.dumps({"url": url, "title": title, "facts": facts}) + "\n")
+            out.flush()
+
 # -----------------------------
 # BS4 HTML ARTICLE RETRIEVAL
 # -----------------------------
 
-def fetch_article_text(url):
-    try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
+# Streaming download limits
+MAX_HTML_BYTES = 3 * 1024 * 1024     # stop reading a page past this many bytes
+HTML_CHUNK_BYTES = 64 * 1024
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+def _html_encoding(r, first_chunk):
+    """Charset from the Content-Type header, else <meta charset>, else UTF-8."""
+    content_type = r.headers.get("Content-Type", "")
+    if "charset=" in content_type.lower():
+        charset = content_type.lower().split("charset=", 1)[1].split(";")[0].strip(" \"'")
+        if charset:
+            return charset
+    m = META_CHARSET_RE.search(first_chunk[:4096])
+    if m:
+        return m.group(1).decode("ascii")
+    return "utf-8"
+
+class _ArticleEndDetector:
+    """
+    Watches decoded HTML for the first <article> to close after a <p>
+    inside it. Nested <article> elements (related-story cards in the body)
+    are tracked by depth, so only the outer one's closing tag counts. The
+    parser picks the first <article> as the container, so its paragraphs
+    are complete at that point.
+    """
 
-        soup = BeautifulSoup(r.text, "html.parser")
+    TAG_RE = re.compile(r"<(/?)(article|p)(?=[\s>/])")
+
+    def __init__(self):
+        self.depth = 0
+        self.seen_p = False
+        self.done = False
+        self.gave_up = False
+        self.tail = ""
+
+    def feed(self, text):
+        """Feed the next decoded chunk; True once the article has ended."""
+        if self.done or self.gave_up:
+            return self.done
+        buf = self.tail + text.lower()
+        pos = 0
+        for m in self.TAG_RE.finditer(buf):
+            pos = m.end()
+            closing, tag = m.group(1), m.group(2)
+            if tag == "p":
+                self.seen_p = self.seen_p or self.depth > 0
+            elif not closing:
+                self.depth += 1
+            elif self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    # First <article> closed; without a <p> the parser
+                    # falls back to other selectors, so read the whole page
+                    self.done = self.seen_p
+                    self.gave_up = not self.seen_p
+                    break
+        # Keep enough to catch a tag split across chunks (a tag at the very
+        # end has no following character yet), but never anything already consumed
+        self.tail = buf[max(pos, len(buf) - 16):]
+        return self.done
+
+def download_article_html(url, etag=None, last_modified=None, max_bytes=MAX_HTML_BYTES):
+    """
+    Stream an article page. Returns (response, html); html is None when
+    cached validators were passed and the server answered 304 Not Modified.
+
+    The body is decoded chunk by chunk and reading stops after `max_bytes`
+    or once the first <article> container has been closed, so large pages
+    never sit fully in memory.
+    """
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    with stage_slot("fetch"):
+        r = http_get(url, headers=headers, stream=True)
+        try:
+            if r.status_code == 304:
+                return r, None
+            r.raise_for_status()
+
+            decoder = None
+            detector = _ArticleEndDetector()
+            parts = []
+            received = 0
+            for chunk in r.iter_content(chunk_size=HTML_CHUNK_BYTES):
+                if decoder is None:
+                    encoding = _html_encoding(r, chunk)
+                    try:
+                        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                    except LookupError:
+                        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                received += len(chunk)
+                text = decoder.decode(chunk)
+                parts.append(text)
+                if detector.feed(text):
+                    break
+                if received >= max_bytes:
+                    logging.info(f"Stopped reading {url} at {received} bytes")
+                    break
+            if decoder is not None:
+                parts.append(decoder.decode(b"", final=True))
+            METRICS.count("page_bytes", received, domain=article_domain(url))
+            return r, "".join(parts)
+        finally:
+            r.close()
+
+def _paragraph_texts(paragraphs):
+    texts = (p.get_text(strip=True) for p in paragraphs)
+    return [t for t in texts if t]
+
+def _parse_article_bs4(html, profile=None):
+    """
+    Returns (paragraphs, author, content selector, byline selector) using
+    BeautifulSoup's pure-Python parser.
+    """
+    profile = profile or {}
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    paragraphs, content_selector = [], None
+
+    # The domain's learned container first: one query instead of fifteen
+    preferred = profile.get("content_selector")
+    if preferred:
+        container = soup.select_one(preferred)
+        if container:
+            paragraphs = _paragraph_texts(container.find_all("p"))
+            content_selector = preferred if paragraphs else None
 
+    if not paragraphs:
         # Try to locate the main article container
         container = None
         for selector in ARTICLE_SELECTORS:
@@ -455,194 +1295,1103 @@ def fetch_article_text(url):
 
         # Extract paragraphs from the container if found
         if container:
-            paragraphs = [
-                p.get_text(strip=True)
-                for p in container.find_all("p")
-                if p.get_text(strip=True)
-            ]
-
-            # Fallback: container exists but has no <p> tags
-            if not paragraphs:
-                paragraphs = [
-                    p.get_text(strip=True)
-                    for p in soup.find_all("p")
-                    if p.get_text(strip=True)
-                ]
+            paragraphs = _paragraph_texts(container.find_all("p"))
+            content_selector = selector if paragraphs else None
+
+    # No container, or a container without <p> tags → fall back to all <p> tags
+    if not paragraphs:
+        paragraphs = _paragraph_texts(soup.find_all("p"))
+
+    author, byline_selector = _find_author(soup, profile.get("byline_selector"))
+    return paragraphs, author, content_selector, byline_selector
+
+# -----------------------------
+# FAST (LXML) HTML PARSING
+# -----------------------------
+
+# Text inside these never counts as article text (matches BeautifulSoup's get_text)
+NON_TEXT_TAGS = {"script", "style", "template"}
+
+def _compile_selector(selector):
+    """
+    Compile the small CSS subset our selector lists use: `tag`, `.class`,
+    `tag[attr='value']` and one `ancestor descendant` step.
+    """
+    compiled = []
+    for part in selector.split():
+        m = re.fullmatch(r"([a-z0-9]*)(?:\.([\w-]+))?(?:\[([\w-]+)='([^']*)'\])?", part)
+        if not m:
+            raise ValueError(f"Unsupported selector: {selector}")
+        compiled.append((m.group(1) or None, m.group(2), m.group(3), m.group(4)))
+    return compiled
+
+def _matches(el, spec):
+    tag, cls, attr, value = spec
+    if tag and el.tag != tag:
+        return False
+    if cls and cls not in (el.get("class") or "").split():
+        return False
+    if attr and el.get(attr) != value:
+        return False
+    return True
+
+COMPILED_ARTICLE_SELECTORS = [_compile_selector(s) for s in ARTICLE_SELECTORS]
+COMPILED_BYLINE_SELECTORS = [_compile_selector(s) for s in BYLINE_SELECTORS]
+
+def _index_selectors(compiled):
+    """
+    Bucket selectors by the class (or tag) their last step needs, so each
+    element is only tested against selectors that could match it.
+    """
+    by_key = defaultdict(list)
+    ancestors = []
+    for i, spec in enumerate(compiled):
+        tag, cls, _, _ = spec[-1]
+        by_key[("class", cls) if cls else ("tag", tag)].append(i)
+        if len(spec) == 2:
+            ancestors.append((i, spec[0]))
+    return by_key, ancestors
+
+def _lxml_strings(el):
+    """Text nodes under `el` in document order, skipping comments and scripts."""
+    if not isinstance(el.tag, str) or el.tag in NON_TEXT_TAGS:
+        return
+    if el.text:
+        yield el.text
+    for child in el:
+        yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+def _lxml_text(el):
+    """Equivalent of BeautifulSoup's get_text(strip=True)."""
+    return "".join(s.strip() for s in _lxml_strings(el) if s.strip())
+
+def _parse_article_lxml(html, profile=None):
+    """
+    Returns (paragraphs, author, content selector, byline selector) from one
+    walk over the lxml tree.
+
+    The walk records the first match of every article and byline selector,
+    every <p> with the containers it sits in, the first "By ..." string and
+    the first ten p/span/div elements, so container choice, paragraph
+    collection and author detection need no further document scans.
+    """
+    import lxml.html
+    from lxml import etree
+
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+    root = lxml.html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+    selectors = COMPILED_ARTICLE_SELECTORS + COMPILED_BYLINE_SELECTORS
+    n_article = len(COMPILED_ARTICLE_SELECTORS)
+    by_key, ancestor_specs = _index_selectors(selectors)
+    first_match = [None] * len(selectors)
+    # open-ancestor counts for "ancestor descendant" selectors
+    open_ancestors = [0] * len(selectors)
+    open_containers = set()
+
+    paragraphs = []       # (text, indices of article containers it is inside)
+    by_name = None
+    top_elements = []
+
+    for event, el in etree.iterwalk(root, events=("start", "end")):
+        is_element = isinstance(el.tag, str)
+
+        if event == "start":
+            if by_name is None and el.text:
+                by_name = _by_prefix_name(el.text)
+            if not is_element:
+                continue
+
+            candidates = list(by_key.get(("tag", el.tag), ()))
+            for cls in (el.get("class") or "").split():
+                candidates.extend(by_key.get(("class", cls), ()))
+            for i in candidates:
+                spec = selectors[i]
+                if first_match[i] is None and _matches(el, spec[-1]) and (
+                    len(spec) == 1 or open_ancestors[i] > 0
+                ):
+                    first_match[i] = el
+                    if i < n_article:
+                        open_containers.add(i)
+            for i, ancestor in ancestor_specs:
+                if _matches(el, ancestor):
+                    open_ancestors[i] += 1
+
+            if el.tag in ("p", "span", "div") and len(top_elements) < 10:
+                top_elements.append(el)
 
         else:
-            # No container found → fallback to all <p> tags
-            paragraphs = [
-                p.get_text(strip=True)
-                for p in soup.find_all("p")
-                if p.get_text(strip=True)
-            ]
-
-        # Remove byline if present
-        paragraphs = remove_byline(paragraphs)
-        author = extract_author_name(soup)
-        if author:
-            paragraphs = [
-                p for p in paragraphs
-                if author.lower() not in p.lower()
-            ]
-        
-        return "\n".join(paragraphs).strip()
+            if is_element:
+                if el.tag == "p":
+                    text = _lxml_text(el)
+                    if text:
+                        paragraphs.append((text, frozenset(open_containers)))
+                for i, ancestor in ancestor_specs:
+                    if _matches(el, ancestor):
+                        open_ancestors[i] -= 1
+                for i in [i for i in open_containers if first_match[i] is el]:
+                    open_containers.discard(i)
+            if by_name is None and el.tail:
+                by_name = _by_prefix_name(el.tail)
+
+    profile = profile or {}
+
+    def container_texts(i):
+        return [text for text, inside in paragraphs if i in inside]
+
+    # The domain's learned container first, else the first selector (in
+    # priority order) that matched anything
+    texts, content_index = [], None
+    preferred = profile.get("content_selector")
+    if preferred in ARTICLE_SELECTORS:
+        i = ARTICLE_SELECTORS.index(preferred)
+        if first_match[i] is not None:
+            texts, content_index = container_texts(i), i
+    if not texts:
+        content_index = next((i for i in range(n_article) if first_match[i] is not None), None)
+        if content_index is not None:
+            texts = container_texts(content_index)
+    if not texts:
+        texts = [text for text, _ in paragraphs]
+        content_index = None
+
+    # Author, in the same order of preference as extract_author_name
+    author, byline_index = None, None
+    byline_order = list(range(len(BYLINE_SELECTORS)))
+    if profile.get("byline_selector") in BYLINE_SELECTORS:
+        byline_order.insert(0, BYLINE_SELECTORS.index(profile["byline_selector"]))
+    for j in byline_order:
+        el = first_match[n_article + j]
+        if el is not None:
+            author = _byline_name(_lxml_text(el))
+            if author:
+                byline_index = j
+                break
+    if not author:
+        author = by_name
+    if not author:
+        for el in top_elements:
+            author = _top_name(_lxml_text(el))
+            if author:
+                break
+
+    return (
+        texts,
+        author,
+        ARTICLE_SELECTORS[content_index] if content_index is not None else None,
+        BYLINE_SELECTORS[byline_index] if byline_index is not None else None,
+    )
+
+def parse_article_html(html, domain=None):
+    """
+    Article text from a page: container paragraphs minus byline and author
+    lines. Uses the single-pass lxml parser when lxml is installed, else
+    BeautifulSoup. With a `domain`, its learned selectors are tried first
+    and whatever worked is recorded back into DOMAIN_PROFILES.
+    """
+    profile = DOMAIN_PROFILES.get(domain) if domain else {}
+    result = None
+    try:
+        result = _parse_article_lxml(html, profile)
+    except ImportError:
+        pass  # lxml not installed
+    except Exception as e:
+        logging.info(f"lxml parse failed, using BeautifulSoup: {e}")
+    if result is None:
+        result = _parse_article_bs4(html, profile)
+    paragraphs, author, content_selector, byline_selector = result
+
+    if domain:
+        DOMAIN_PROFILES.update(
+            domain,
+            content_selector=content_selector,
+            byline_selector=byline_selector,
+        )
+
+    # Remove byline if present
+    paragraphs = remove_byline(paragraphs)
+    if author:
+        paragraphs = [
+            p for p in paragraphs
+            if author.lower() not in p.lower()
+        ]
+    
+    return "\n".join(paragraphs).strip()
+
+def _fetch_static(url):
+    """Returns (text, etag, last_modified); text is None on failure."""
+    domain = article_domain(url)
+    try:
+        with METRICS.span("static_fetch", domain):
+            r, html = download_article_html(url)
+        with METRICS.span("parse", domain):
+            text = parse_article_html(html, domain)
+        return text, r.headers.get("ETag"), r.headers.get("Last-Modified")
 
     except Exception as e:
         print(f"Error fetching article: {e}")
-        return None
+        return None, None, None
+
+def fetch_article_text(url):
+    return _fetch_static(url)[0]
        
 # -----------------------------
 # PLAYWRIGHT ARTICLE RETRIEVAL
 # -----------------------------
 
-def fetch_article_text_playwright(url):
+# Browser pool settings
+BROWSER_POOL_SIZE = STAGE_LIMITS["playwright"]  # browsers == max open pages
+BROWSER_MAX_PAGES = 50        # recycle a browser after this many pages
+BROWSER_MAX_RSS_MB = 1500     # recycle when browser processes grow past this
+BROWSER_RUN_TIMEOUT = 120     # seconds a caller waits for a pooled page, queueing included
+
+# Requests the pooled browser never loads
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_URL_PATTERNS = [
+    "doubleclick.net", "googlesyndication.com", "googletagmanager.com",
+    "google-analytics.com", "googleadservices.com", "adservice.google",
+    "amazon-adsystem.com", "taboola.com", "outbrain.com",
+    "scorecardresearch.com", "chartbeat.", "quantserve.com",
+]
+
+def _block_heavy_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        pat in request.url for pat in BLOCKED_URL_PATTERNS
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+def _child_processes_rss_mb():
+    """Total RSS (MB) of every process started by this one (Linux only, else 0)."""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_default_timeout(30000)
-
-            page.goto(url, timeout=45000)
-            page.wait_for_selector("p", state="attached")
-
-            # Try article containers first
-            container = None
-            for selector in ARTICLE_SELECTORS:
-                container = page.query_selector(selector)
-                if container:
-                    break
+        parents = {}
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # ppid is the 2nd field after the ")" closing the command name
+            parents[int(pid)] = int(stat.rsplit(")", 1)[1].split()[1])
+
+        descendants = set()
+        frontier = [os.getpid()]
+        while frontier:
+            parent = frontier.pop()
+            for pid, ppid in parents.items():
+                if ppid == parent and pid not in descendants:
+                    descendants.add(pid)
+                    frontier.append(pid)
+
+        total_kb = 0
+        for pid in descendants:
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total_kb += int(line.split()[1])
+                            break
+            except OSError:
+                continue
+        return total_kb / 1024
+    except Exception:
+        return 0
 
-            if container:
-                paragraphs = [
-                    p.inner_text().strip()
-                    for p in container.query_selector_all("p")
-                    if p.inner_text().strip()
-                ]
-            else:
-                paragraphs = [
-                    p.inner_text().strip()
-                    for p in page.query_selector_all("p")
-                    if p.inner_text().strip()
-                ]
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every article worker.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    pool thread owns one browser + context and renders one page at a time;
+    callers hand work over through a queue. That caps open pages at `size`.
+    A browser is recycled after `max_pages` pages or when the browser
+    processes use more than `max_rss_mb`.
+    """
 
-            # 🔥 Remove byline here
-            paragraphs = remove_byline(paragraphs)
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES,
+                 max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args):
+        """Call fn(page, *args) on a fresh page from the pool and return its result."""
+        from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+        self._start()
+        future = Future()
+        self._jobs.put((future, fn, args))
+        try:
+            return future.result(timeout=BROWSER_RUN_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for t in threads:
+            t.join(timeout=30)
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.size):
+                t = threading.Thread(target=self._worker, name=f"browser-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _launch(self, pw):
+        browser = pw.chromium.launch(headless=True)
+        context = browser.new_context(user_agent="Mozilla/5.0")
+        context.set_default_timeout(30000)
+        context.route("**/*", _block_heavy_requests)
+        return browser, context
+
+    def _worker(self):
+        try:
+            from playwright.sync_api import sync_playwright
 
-            return "\n".join(paragraphs).strip()
+            pw = sync_playwright().start()
+        except Exception as e:
+            self._startup_failed(e)
+            return
 
-    except Exception as e:
-        print(f"Playwright error: {e}")
-        return None
+        browser = context = None
+        pages_served = 0
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                future, fn, args = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                if browser is not None and (
+                    pages_served >= self.max_pages
+                    or _child_processes_rss_mb() > self.max_rss_mb
+                ):
+                    logging.info("Recycling pooled browser")
+                    self._shutdown(browser)
+                    browser = None
+
+                page = None
+                try:
+                    if browser is None:
+                        browser, context = self._launch(pw)
+                        pages_served = 0
+                    page = context.new_page()
+                    future.set_result(fn(page, *args))
+                except Exception as e:
+                    future.set_exception(e)
+                    # A dead browser fails every later page; start over
+                    if browser is not None and not browser.is_connected():
+                        self._shutdown(browser)
+                        browser = None
+                finally:
+                    pages_served += 1
+                    if page is not None:
+                        try:
+                            page.close()
+                        except Exception:
+                            pass
+        finally:
+            if browser is not None:
+                self._shutdown(browser)
+            pw.stop()
+
+    def _startup_failed(self, error):
+        """
+        Drop this thread from the pool so the next run() starts a new one.
+        When no pool thread is left, fail the queued pages instead of
+        leaving their callers waiting.
+        """
+        logging.error(f"Browser pool thread could not start Playwright: {error}")
+        with self._lock:
+            if threading.current_thread() in self._threads:
+                self._threads.remove(threading.current_thread())
+            if self._threads:
+                return
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None and job[0].set_running_or_notify_cancel():
+                    job[0].set_exception(error)
 
-    finally:
+    @staticmethod
+    def _shutdown(browser):
         try:
             browser.close()
-        except:
+        except Exception:
             pass
 
-# -----------------------------
-# GEMINI EXTRACTION
-# -----------------------------
+BROWSER_POOL = BrowserPool()
 
-def gemini_extract(article):
-    """Extract cause/location/summary using Gemini with safe fallbacks."""
-    title = article.get("title", "")
-    desc = article.get("description", "")
-    url = article.get("url", "")
+def _inner_texts(elements):
+    texts = (el.inner_text().strip() for el in elements)
+    return [t for t in texts if t]
 
-    prompt = f"""
-Analyze this Charleston-area accident article:
+def _render_article(page, url):
+    response = page.goto(url, timeout=45000)
+    page.wait_for_selector("p", state="attached")
 
-Title: {title}
-Description: {desc}
-URL: {url}
+    # Try article containers first, the domain's learned one before the rest
+    domain = article_domain(url)
+    preferred = DOMAIN_PROFILES.get(domain).get("content_selector")
+    selectors = ([preferred] if preferred else []) + ARTICLE_SELECTORS
 
-Return ONLY JSON:
-{{
-    "cause": "main cause (speeding/DUI/weather/unknown)",
-    "location": "specific road/area",
-    "summary": "concise 1-3 sentence key facts"
-}}
+    container = None
+    for selector in selectors:
+        container = page.query_selector(selector)
+        if container:
+            break
 
-Do NOT fabricate information.
-Do NOT modify URLs.
-"""
+    if container:
+        paragraphs = _inner_texts(container.query_selector_all("p"))
+        DOMAIN_PROFILES.update(domain, content_selector=selector if paragraphs else None)
+    else:
+        paragraphs = _inner_texts(page.query_selector_all("p"))
+        DOMAIN_PROFILES.update(domain, content_selector=None)
 
+    # 🔥 Remove byline here
+    paragraphs = remove_byline(paragraphs)
+
+    headers = response.headers if response else {}
+    return (
+        "\n".join(paragraphs).strip(),
+        headers.get("etag"),
+        headers.get("last-modified"),
+    )
+
+def _fetch_playwright(url):
+    """Returns (text, etag, last_modified); text is None on failure."""
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config={"response_mime_type": "application/json"}
-        )
-        return json.loads(response.text)
+        with METRICS.span("playwright_fetch", article_domain(url)):
+            return BROWSER_POOL.run(_render_article, url)
+
     except Exception as e:
-        logging.error(f"Gemini error: {e}")
-        return None
+        print(f"Playwright error: {e}")
+        return None, None, None
+
+def fetch_article_text_playwright(url):
+    return _fetch_playwright(url)[0]
 
 # -----------------------------
-# OLLAMA EXTRACTION
+# TIERED ARTICLE RETRIEVAL
 # -----------------------------
-def ollama_extract(article):
-    # Pull the article text safely
-    content = article.get("content") or article.get("description") or ""
-    prompt = f"""
-You are an information extraction assistant.
 
-Extract the following fields from the accident report:
+# Static text shorter than this is treated as a failed fetch
+MIN_STATIC_TEXT_CHARS = 400
+
+# Text that means we got a JS-rendered shell instead of the article
+JS_SHELL_MARKERS = [
+    "enable javascript",
+    "javascript is disabled",
+    "javascript is required",
+    "requires javascript",
+    "please enable js",
+    "browser does not support",
+]
 
-- summary: a 1–3 sentence summary of the crash
-- location: the city, road, or area where it happened
-- cause: the cause of the crash if known, otherwise "unknown"
+# Consecutive JS-shell static fetches before a domain goes browser-first
+JS_SHELL_STRIKES = 3
 
-Return ONLY valid JSON with these exact keys:
-summary, location, cause
+# Browser-first domains still try the static fetch this often (in fetches)
+STATIC_REPROBE_EVERY = 25
 
-Article:
-\"\"\"{content}\"\"\"
+def article_domain(url):
+    """Map a URL to its entry in ALLOWED_DOMAINS (or its bare host)."""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    for domain in ALLOWED_DOMAINS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return host
 
-JSON:
-"""
+def looks_like_js_shell(text):
+    lower = (text or "").lower()
+    return any(marker in lower for marker in JS_SHELL_MARKERS)
 
-    response = ollama.generate(
-        model="qwen2:0.5b",
-        prompt=prompt,
-        options={
-            "temperature": 0.1,
-            "num_predict": 300
-        }
-    )
-    text = response["response"].strip()
+def static_text_is_usable(text):
+    if not text or len(text) < MIN_STATIC_TEXT_CHARS:
+        return False
+    return not looks_like_js_shell(text)
 
-    try:
+def _remember_fetch_method(domain, method):
+    if DOMAIN_PROFILES.get(domain).get("fetch_method") != method:
+        logging.info(f"Fetch method for {domain}: {method}")
+    DOMAIN_PROFILES.update(domain, fetch_method=method,
+                           js_shell_strikes=None, static_skips=None)
+
+def _fetch_tiered(url):
+    """
+    Cheap requests + BeautifulSoup fetch first; escalate to the headless
+    browser only when the static text is empty, too short or a JS shell.
+    A domain skips the static attempt once JS_SHELL_STRIKES static fetches
+    in a row came back as a JS shell (a merely short article proves
+    nothing), and re-probes static every STATIC_REPROBE_EVERY fetches after
+    that. Remembered across runs in DOMAIN_PROFILES.
+
+    Returns (text, method, etag, last_modified).
+    """
+    domain = article_domain(url)
+    static = (None, None, None)
+    profile = DOMAIN_PROFILES.get(domain)
+    learned = profile.get("fetch_method")
+    skips = profile.get("static_skips", 0)
+    strikes = profile.get("js_shell_strikes", 0)
+    try_static = learned != "playwright" or skips >= STATIC_REPROBE_EVERY
+
+    if try_static:
+        static = _fetch_static(url)
+        if static_text_is_usable(static[0]):
+            _remember_fetch_method(domain, "static")
+            return static[0], "static", static[1], static[2]
+        if looks_like_js_shell(static[0]):
+            strikes += 1
+            DOMAIN_PROFILES.update(domain, js_shell_strikes=strikes)
+        if learned == "playwright":
+            DOMAIN_PROFILES.update(domain, static_skips=None)
+    else:
+        DOMAIN_PROFILES.update(domain, static_skips=skips + 1)
+
+    browser = _fetch_playwright(url)
+    if static_text_is_usable(browser[0]):
+        if learned != "playwright" and strikes >= JS_SHELL_STRIKES:
+            _remember_fetch_method(domain, "playwright")
+        return browser[0], "playwright", browser[1], browser[2]
+
+    # Browser didn't help either; return whatever we have
+    if browser[0] and len(browser[0]) > len(static[0] or ""):
+        return browser[0], "playwright", browser[1], browser[2]
+    if not try_static:
+        # The browser stopped working for this domain; see if plain HTTP does now
+        static = _fetch_static(url)
+        if static_text_is_usable(static[0]):
+            _remember_fetch_method(domain, "static")
+    if static[0]:
+        return static[0], "static", static[1], static[2]
+    return browser[0], "playwright", browser[1], browser[2]
+
+# -----------------------------
+# ARTICLE CONTENT CACHE
+# -----------------------------
+
+ARTICLE_CACHE_PATH = os.path.join(CACHE_DIR, "article_cache.sqlite")
+ARTICLE_CACHE_FRESH_SECONDS = 12 * 3600        # serve with no request at all
+ARTICLE_CACHE_TTL_SECONDS = 35 * 24 * 3600     # GNews window is 30 days
+ARTICLE_CACHE_MAX_BYTES = 100 * 1024 * 1024    # evict least recently used past this
+
+class ArticleCache:
+    """
+    SQLite store of extracted article text keyed by URL, with the ETag /
+    Last-Modified validators needed to revalidate it with a conditional GET.
+    """
+
+    def __init__(self, path=ARTICLE_CACHE_PATH, ttl=ARTICLE_CACHE_TTL_SECONDS,
+                 max_bytes=ARTICLE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    method TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    used_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_used_at ON articles(used_at)"
+            )
+            self._evict()
+        return self._conn
+
+    def get(self, url):
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT * FROM articles WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            if time.time() - row["fetched_at"] > self.ttl:
+                db.execute("DELETE FROM articles WHERE url = ?", (url,))
+                db.commit()
+                return None
+            db.execute("UPDATE articles SET used_at = ? WHERE url = ?", (time.time(), url))
+            db.commit()
+            return dict(row)
+
+    def put(self, url, text, method=None, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, text, method, etag, last_modified, now, now, len(text.encode("utf-8"))),
+            )
+            self._evict()
+            db.commit()
+
+    def mark_fresh(self, url):
+        """Server answered 304: restart the entry's freshness clock."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE articles SET fetched_at = ?, used_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            db.commit()
+
+    def _evict(self):
+        db = self._conn
+        db.execute("DELETE FROM articles WHERE fetched_at < ?", (time.time() - self.ttl,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        if total > self.max_bytes:
+            rows = db.execute("SELECT url, size FROM articles ORDER BY used_at").fetchall()
+            for row in rows:
+                if total <= self.max_bytes:
+                    break
+                db.execute("DELETE FROM articles WHERE url = ?", (row["url"],))
+                total -= row["size"]
+        db.commit()
+
+ARTICLE_CACHE = ArticleCache()
+
+def _revalidate_cached(url, entry):
+    """Conditional GET for a stale entry. Returns the text to use, or None to refetch."""
+    if not (entry["etag"] or entry["last_modified"]):
+        return None
+    try:
+        r, html = download_article_html(url, entry["etag"], entry["last_modified"])
+    except Exception as e:
+        logging.info(f"Revalidation failed for {url}: {e}")
+        return entry["text"]
+
+    if html is None:
+        ARTICLE_CACHE.mark_fresh(url)
+        return entry["text"]
+
+    # Page changed. A static page is already downloaded, so just reparse it
+    if entry["method"] == "static":
+        text = parse_article_html(html, article_domain(url))
+        if static_text_is_usable(text):
+            ARTICLE_CACHE.put(url, text, "static",
+                              r.headers.get("ETag"), r.headers.get("Last-Modified"))
+            return text
+    return None
+
+def fetch_article_text_tiered(url):
+    """
+    Article text for `url`, from the on-disk cache when possible. Fresh
+    entries cost nothing, stale ones one conditional GET; anything else
+    goes through the static-first / Playwright fetch.
+    """
+    try:
+        entry = ARTICLE_CACHE.get(url)
+    except sqlite3.Error as e:
+        logging.error(f"Article cache error: {e}")
+        entry = None
+
+    # Entries written before unusable text stopped being cached are refetched
+    if entry and not static_text_is_usable(entry["text"]):
+        entry = None
+
+    if entry:
+        if time.time() - entry["fetched_at"] < ARTICLE_CACHE_FRESH_SECONDS:
+            METRICS.count("article_cache_fresh_hits")
+            return entry["text"]
+        text = _revalidate_cached(url, entry)
+        if text:
+            METRICS.count("article_cache_revalidated")
+            return text
+
+    METRICS.count("article_cache_misses")
+    text, method, etag, last_modified = _fetch_tiered(url)
+    # Last-resort text (short, or a JS shell) is used for this run only; caching
+    # it would let a 304 keep it fresh indefinitely
+    if static_text_is_usable(text):
+        try:
+            ARTICLE_CACHE.put(url, text, method, etag, last_modified)
+        except sqlite3.Error as e:
+            logging.error(f"Article cache error: {e}")
+    return text
+
+# -----------------------------
+# LLM RESULT CACHE
+# -----------------------------
+
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite")
+LLM_CACHE_TTL_SECONDS = 60 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 5000
+
+# Bump a version whenever its prompt wording changes so old outputs stop matching
+PROMPT_VERSIONS = {
+    "gemini_extract": 1,
+    "ollama_extract": 1,
+    "llama_server_extract": 1,
+    "qwen_blog_summary": 1,
+    "llama_server_combined": 1,
+}
+
+def llm_cache_key(model, template, params, text):
+    """Content address for one LLM call: model, prompt version, sampling params, input hash."""
+    key = {
+        "model": model,
+        "template": f"{template}:{PROMPT_VERSIONS[template]}",
+        "params": params,
+        "input": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Persistent memo of LLM outputs (JSON values) with TTL and LRU eviction.
+    `hits` / `misses` count lookups for the run.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL_SECONDS,
+                 max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_used_at ON llm_results(used_at)"
+            )
+            self._evict()
+        return self._conn
+
+    def get(self, key):
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, created_at FROM llm_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or time.time() - row[1] > self.ttl:
+                    self.misses += 1
+                    return None
+                db.execute("UPDATE llm_results SET used_at = ? WHERE key = ?", (time.time(), key))
+                db.commit()
+                self.hits += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logging.error(f"LLM cache error: {e}")
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_results VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                self._evict()
+        except sqlite3.Error as e:
+            logging.error(f"LLM cache error: {e}")
+
+    def _evict(self):
+        db = self._conn
+        db.execute("DELETE FROM llm_results WHERE created_at < ?", (time.time() - self.ttl,))
+        db.execute("""
+            DELETE FROM llm_results WHERE key IN (
+                SELECT key FROM llm_results ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        db.commit()
+
+LLM_CACHE = LLMCache()
+
+# -----------------------------
+# GEMINI EXTRACTION
+# -----------------------------
+
+class LLMOutputError(ValueError):
+    """The backend answered, but not with the JSON we asked for."""
+
+def _gemini_extract(article, timeout=None):
+    """Gemini extraction; raises on any failure."""
+    title = article.get("title", "")
+    desc = article.get("description", "")
+    url = article.get("url", "")
+
+    prompt = f"""
+Analyze this Charleston-area accident article:
+
+Title: {title}
+Description: {desc}
+URL: {url}
+
+Return ONLY JSON:
+{{
+    "cause": "main cause (speeding/DUI/weather/unknown)",
+    "location": "specific road/area",
+    "summary": "concise 1-3 sentence key facts"
+}}
+
+Do NOT fabricate information.
+Do NOT modify URLs.
+"""
+
+    model = setting("GEMINI_MODEL", GEMINI_MODEL)
+    cache_key = llm_cache_key(model, "gemini_extract", {}, prompt)
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    config = {"response_mime_type": "application/json"}
+    if timeout:
+        config["http_options"] = {"timeout": int(timeout * 1000)}
+    with stage_slot("llm"), METRICS.span("llm_gemini_extract"):
+        response = get_gemini_client().models.generate_content(
+            model=model,
+            contents=prompt,
+            config=config
+        )
+    try:
+        result = json.loads(response.text)
+    except (TypeError, ValueError) as e:
+        raise LLMOutputError(f"Gemini returned invalid JSON: {e}")
+    LLM_CACHE.put(cache_key, result)
+    return result
+
+def gemini_extract(article):
+    """Extract cause/location/summary using Gemini with safe fallbacks."""
+    try:
+        return _gemini_extract(article)
+    except Exception as e:
+        logging.error(f"Gemini error: {e}")
+        return None
+
+# -----------------------------
+# OLLAMA EXTRACTION
+# -----------------------------
+_ollama_clients = {}
+
+def _ollama_client(timeout):
+    import ollama
+
+    host = setting("OLLAMA_HOST", OLLAMA_HOST)
+    key = (host, timeout)
+    if key not in _ollama_clients:
+        _ollama_clients[key] = ollama.Client(host=host, timeout=timeout)
+    return _ollama_clients[key]
+
+def _ollama_extract(article, timeout=None):
+    """Ollama extraction; raises on any failure."""
+    # Pull the article text safely
+    content = article.get("content") or article.get("description") or ""
+    prompt = f"""
+You are an information extraction assistant.
+
+Extract the following fields from the accident report:
+
+- summary: a 1–3 sentence summary of the crash
+- location: the city, road, or area where it happened
+- cause: the cause of the crash if known, otherwise "unknown"
+
+Return ONLY valid JSON with these exact keys:
+summary, location, cause
+
+Article:
+\"\"\"{content}\"\"\"
+
+JSON:
+"""
+    options = {
+        "temperature": 0.1,
+        "num_predict": 300
+    }
+    model = setting("OLLAMA_MODEL", OLLAMA_MODEL)
+    cache_key = llm_cache_key(model, "ollama_extract", options, prompt)
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    with stage_slot("llm"), METRICS.span("llm_ollama_extract"):
+        response = _ollama_client(timeout).generate(
+            model=model,
+            prompt=prompt,
+            options=options
+        )
+    text = response["response"].strip()
+
+    try:
         start = text.index("{")
         end = text.rindex("}") + 1
         json_str = text[start:end]
-        return json.loads(json_str)
-    except Exception:
+        result = json.loads(json_str)
+    except ValueError as e:
+        raise LLMOutputError(f"Ollama returned invalid JSON: {e}")
+    LLM_CACHE.put(cache_key, result)
+    return result
+
+def ollama_extract(article):
+    try:
+        return _ollama_extract(article)
+    except LLMOutputError:
         return {
             "summary": "unknown",
             "location": "unknown",
             "cause": "unknown"
         }
 
-# ========================================
-# ===== QWEN BLOG SUMMARY EXTRACTION =====
-# ========================================
+# -----------------------------
+# PROMPT TOKEN BUDGET
+# -----------------------------
 
-def qwen_blog_summary(article):
+# Prompt tokens allowed per llama-server call ("PROMPT_TOKEN_BUDGET" in
+# cred.json). Keep it below the server's context size minus the reply.
+PROMPT_TOKEN_BUDGET = 3072
+
+# Prompts shorter than budget * MIN_CHARS_PER_TOKEN characters fit without
+# asking the tokenizer; CHARS_PER_TOKEN estimates when llama-server can't count.
+MIN_CHARS_PER_TOKEN = 2
+CHARS_PER_TOKEN = 4
+TOKENIZE_TIMEOUT = 10
+
+# Set after the first failed /tokenize call; estimates are used from then on
+_tokenizer_down = threading.Event()
+
+def count_tokens(text):
+    """Token count under the llama-server model, estimated if the server can't say."""
+    if not _tokenizer_down.is_set():
+        try:
+            r = http_post(
+                llama_server_url("/tokenize"),
+                json={"content": text},
+                timeout=(HTTP_CONNECT_TIMEOUT, TOKENIZE_TIMEOUT)
+            )
+            r.raise_for_status()
+            return len(r.json()["tokens"])
+        except Exception as e:
+            _tokenizer_down.set()
+            logging.error(f"Tokenizer unavailable, estimating token counts: {e}")
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def compact_facts(facts):
+    """Structured facts as compact JSON with the empty fields dropped."""
+    kept = {k: v for k, v in facts.items() if v not in (None, "", [], {})}
+    return json.dumps(kept, separators=(",", ":"), ensure_ascii=False)
+
+def _fact_terms(value):
+    """Lowercased short strings (names, dates, crash keywords) found in the facts."""
+    if isinstance(value, str):
+        return {value.lower()} if 2 < len(value) <= 60 else set()
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return set()
+    terms = set()
+    for v in value:
+        terms |= _fact_terms(v)
+    return terms
+
+def select_paragraphs(text, facts, budget, chars_per_token=CHARS_PER_TOKEN):
     """
-    Generate a 3–5 paragraph narrative blog-style summary using Qwen 0.5B.
+    The paragraphs of `text` that fit in `budget` tokens, preferring the lead
+    and those mentioning the most fact terms; original order is kept.
     """
-    url = article.get("url", "")
+    paragraphs = [p for p in text.split("\n") if p.strip()]
+    terms = _fact_terms(facts)
+
+    def score(i):
+        low = paragraphs[i].lower()
+        return sum(t in low for t in terms) + (2 if i == 0 else 0)
+
+    chosen, used = [], 0
+    for i in sorted(range(len(paragraphs)), key=lambda i: (-score(i), i)):
+        cost = len(paragraphs[i]) / chars_per_token + 1
+        if used + cost <= budget:
+            chosen.append(i)
+            used += cost
+
+    if not chosen:
+        # one paragraph bigger than the whole budget
+        return text[:max(0, int(budget * chars_per_token))]
+    return "\n".join(paragraphs[i] for i in sorted(chosen))
+
+def fit_prompt(build, text, facts=None, budget=None):
+    """
+    build(text), with `text` cut down to selected paragraphs when the whole
+    prompt would go over the token budget. `facts` default to those of `text`.
+    """
+    budget = budget or setting("PROMPT_TOKEN_BUDGET", PROMPT_TOKEN_BUDGET)
+    prompt = build(text)
+    if len(prompt) <= budget * MIN_CHARS_PER_TOKEN:
+        return prompt
+    total = count_tokens(prompt)
+    if total <= budget:
+        return prompt
+
+    overhead = count_tokens(build(""))
+    text_tokens = max(total - overhead, 1)
+    chars_per_token = max(len(prompt) - len(build("")), 1) / text_tokens
+    if facts is None:
+        facts = extract_structured_facts(text)
+    trimmed = select_paragraphs(text, facts, budget - overhead, chars_per_token)
+    logging.info(f"Prompt trimmed from {total} tokens to a {budget} token budget")
+    return build(trimmed)
+
+# ========================================
+# ===== QWEN BLOG SUMMARY EXTRACTION =====
+# ========================================
 
+def article_full_text(article):
+    """Full page text, falling back to the GNews content or description."""
     # content = article.get("content") or article.get("description") or ""
-    full_text = (fetch_article_text_playwright(article["url"]) or 
-        fetch_article_text(article["url"]) or 
+    return (fetch_article_text_tiered(article["url"]) or 
         article.get("content") or 
         article.get("description") or 
         ""
     )
+
+def clean_full_text(full_text):
     #print("\n==== FULL TEXT (before) ====")
     #print(full_text)
     #print("=========================")
@@ -650,9 +2399,11 @@ def qwen_blog_summary(article):
     #print("\n==== FULL TEXT (after) =======")
     #print(full_text)
     #print("=========================")
-    clean_text = remove_author_bio(full_text)
+    return remove_author_bio(full_text)
 
-    facts = extract_structured_facts(clean_text)
+def article_facts(clean_text):
+    with METRICS.span("facts"):
+        facts = extract_structured_facts(clean_text)
     facts_json = json.dumps(facts, indent=2)
     
     #print("\n===== CLEAN TEXT ======")
@@ -661,8 +2412,18 @@ def qwen_blog_summary(article):
     print("\n=== EXTRACTED FACTS ===")
     print(facts_json)
     print("=========================")
+    return facts
 
-    prompt = f"""
+def _blog_inputs(article):
+    """Cleaned full article text and its structured facts."""
+    if "clean_text" in article:
+        # Already prepared by the fetch/clean/facts jobs
+        return article["clean_text"], article["facts"]
+    clean_text = clean_full_text(article_full_text(article))
+    return clean_text, article_facts(clean_text)
+
+def _blog_prompt(facts_json, clean_text, task="Write the full blog summary now."):
+    return f"""
 You are a writing assistant that produces narrative-style blog summaries based strictly on the provided article.
 
 You are also given STRUCTURED FACTS extracted from the article.  
@@ -719,33 +2480,59 @@ STRUCTURED FACTS:
 ARTICLE TEXT:
 \"\"\"{clean_text}\"\"\"
 
-Write the full blog summary now.
+{task}
 """
-    try:
-        response = requests.post(
-            "http://localhost:8081/v1/chat/completions",
-            headers={"content-type": "application/json"},
-            json={
-                "model": "qwen2.5-0.5b-instruct-q2_k.gguf",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You write clear, factual, narrative-style blog summaries. "
-                            "You always follow the user's instructions exactly and write only in English."
-                        )
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.4
-            }
-        )
 
-        data = response.json()
-        text = data["choices"][0]["message"]["content"].strip()
+def qwen_blog_summary(article):
+    """
+    Generate a 3–5 paragraph narrative blog-style summary using Qwen 0.5B.
+    """
+    clean_text, facts = _blog_inputs(article)
+    facts_json = compact_facts(facts)
+    prompt = fit_prompt(lambda text: _blog_prompt(facts_json, text), clean_text, facts)
+
+    payload = {
+        "model": setting("LLAMA_SERVER_MODEL", LLAMA_SERVER_MODEL),
+        "messages": [
+            {
+                "role": "system",
+                "content": (
+                    "You write clear, factual, narrative-style blog summaries. "
+                    "You always follow the user's instructions exactly and write only in English."
+                )
+            },
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.4
+    }
+    cache_key = llm_cache_key(
+        payload["model"], "qwen_blog_summary", {"temperature": 0.4},
+        json.dumps(payload["messages"])
+    )
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    breaker = LLM_BACKENDS["llama_server"]["breaker"]
+    if not breaker.allow():
+        logging.error("Blog summary skipped: llama-server circuit is open")
+        return "Unable to generate blog summary."
+
+    try:
+        text = llama_chat(
+            payload, "qwen_blog_summary", timeout=backend_timeout("llama_server")
+        ).strip()
+        breaker.record_success()
+        LLM_CACHE.put(cache_key, text)
         return text
 
+    except ValueError as e:
+        # The server answered, just not usefully; also ends a half-open trial
+        breaker.record_success()
+        logging.error(f"Blog summary error: {e}")
+        return "Unable to generate blog summary."
     except Exception as e:
+        breaker.record_failure()
         logging.error(f"Blog summary error: {e}")
         return "Unable to generate blog summary."
 
@@ -753,14 +2540,116 @@ Write the full blog summary now.
 # LLAMA-SERVER EXTRACTION
 #------------------------------
 
-def llama_server_extract(article):
+def llama_server_url(path):
+    return setting("LLAMA_SERVER_URL", LLAMA_SERVER_URL).rstrip("/") + path
+
+def llama_server_slots():
     """
-    Extract summary/location/cause using Qwen 0.5B running on llama-server (port 8081)
+    Completions llama-server runs at once (its --parallel slots), from
+    "LLAMA_SERVER_PARALLEL" in cred.json or the server's /props. None if
+    neither is available.
     """
+    configured = setting("LLAMA_SERVER_PARALLEL", None)
+    if configured:
+        return int(configured)
+    try:
+        r = http_get(llama_server_url("/props"), timeout=(HTTP_CONNECT_TIMEOUT, 10))
+        r.raise_for_status()
+        return int(r.json()["total_slots"])
+    except Exception as e:
+        logging.error(f"Could not read llama-server slot count: {e}")
+        return None
 
-    content = article.get("content") or article.get("description") or ""
-
-    prompt = f"""
+def match_llama_server_slots():
+    """Size the llama_server stage to the server's slots; returns the limit in use."""
+    slots = llama_server_slots()
+    if slots and slots != STAGE_LIMITS["llama_server"]:
+        set_stage_limit("llama_server", slots)
+        logging.info(f"llama-server: {slots} parallel slots")
+    return STAGE_LIMITS["llama_server"]
+
+class _JSONObjectEnd:
+    """Fed streamed text; `done` once the first top-level {...} has closed."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"' and self.depth:
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    self.done = True
+                    return
+
+def llama_chat(payload, task, timeout=None, stop_after_json=False):
+    """
+    Streamed content of one llama-server chat completion. With
+    `stop_after_json` the stream is closed as soon as a complete top-level
+    JSON object has arrived instead of waiting out the token budget.
+
+    Prompts keep their fixed instructions ahead of the article text, so with
+    cache_prompt the server only evaluates the new suffix. `task` picks a
+    pinned slot from LLAMA_SERVER_SLOTS, if any, so each prompt type keeps
+    its own cached prefix.
+    """
+    payload = dict(payload, stream=True, cache_prompt=True)
+    slot = setting("LLAMA_SERVER_SLOTS", LLAMA_SERVER_SLOTS).get(task)
+    if slot is not None:
+        payload["id_slot"] = slot
+
+    parts = []
+    end = _JSONObjectEnd() if stop_after_json else None
+    with stage_slot("llama_server"), METRICS.span(f"llm_{task}"):
+        response = http_post(
+            llama_server_url("/v1/chat/completions"),
+            headers={"content-type": "application/json"},
+            json=payload,
+            timeout=None if timeout is None else (HTTP_CONNECT_TIMEOUT, timeout),
+            stream=True
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines(chunk_size=None):
+                line = line.decode("utf-8", "replace").strip()
+                if line.startswith("error:"):
+                    raise RuntimeError(line[6:].strip())
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choice = json.loads(data)["choices"][0]
+                chunk = (choice.get("delta") or {}).get("content") or ""
+                parts.append(chunk)
+                if end is not None:
+                    end.feed(chunk)
+                    if end.done:
+                        break
+                if choice.get("finish_reason"):
+                    break
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"unexpected stream event: {e}")
+        finally:
+            response.close()
+    return "".join(parts)
+
+def _extract_prompt(content):
+    return f"""
 You are an information extraction assistant.
 
 Extract the following fields from the accident report:
@@ -787,36 +2676,59 @@ Article:
 \"\"\"{content}\"\"\"
 """
 
-    try:
-        response = requests.post(
-            "http://localhost:8081/v1/chat/completions",
-            headers={"content-type": "application/json"},
-            json={
-                "model": "qwen2.5-0.5b-instruct-q2_k.gguf",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a strict information extraction assistant. "
-                            "You output ONLY valid JSON. No explanations, no markdown, no commentary."
-                        )
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.1
-            }
-        )
+def _llama_server_extract(article, timeout=None):
+    """llama-server extraction; raises on any failure."""
+
+    content = article.get("content") or article.get("description") or ""
+    prompt = fit_prompt(_extract_prompt, content)
+
+    payload = {
+        "model": setting("LLAMA_SERVER_MODEL", LLAMA_SERVER_MODEL),
+        "messages": [
+            {
+                "role": "system",
+                "content": (
+                    "You are a strict information extraction assistant. "
+                    "You output ONLY valid JSON. No explanations, no markdown, no commentary."
+                )
+            },
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.1
+    }
+    cache_key = llm_cache_key(
+        payload["model"], "llama_server_extract", {"temperature": 0.1},
+        json.dumps(payload["messages"])
+    )
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-        data = response.json()
-        text = data["choices"][0]["message"]["content"].strip()
+    try:
+        text = llama_chat(
+            payload, "llama_server_extract", timeout=timeout, stop_after_json=True
+        ).strip()
+    except ValueError as e:
+        raise LLMOutputError(f"llama-server stream error: {e}")
 
+    try:
         json_match = re.search(r"\{[\s\S]*\}", text)
         if not json_match:
             raise ValueError("No JSON Found")
 
         json_str = json_match.group(0)
-        return json.loads(json_str)
+        result = json.loads(json_str)
+    except ValueError as e:
+        raise LLMOutputError(f"llama-server returned invalid JSON: {e}")
+    LLM_CACHE.put(cache_key, result)
+    return result
 
+def llama_server_extract(article):
+    """
+    Extract summary/location/cause using Qwen 0.5B running on llama-server (port 8081)
+    """
+    try:
+        return _llama_server_extract(article)
     except Exception as e:
         logging.error(f"llama-server extraction error: {e}")
         return {
@@ -824,14 +2736,226 @@ Article:
             "location": "unknown",
             "cause": "unknown"
         }
-    
+
+#------------------------------
+# COMBINED EXTRACTION + BLOG SUMMARY
+#------------------------------
+
+# One llama-server generation returns the extraction fields and the blog
+# summary together; the article is only prompt-processed once. Set to False
+# (or "COMBINED_LLM_CALL": false in cred.json) for the two separate calls.
+COMBINED_LLM_CALL = True
+COMBINED_TEMPERATURE = 0.3
+
+INCIDENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "location": {"type": "string"},
+        "cause": {"type": "string"},
+        "blog_summary": {"type": "string"},
+    },
+    "required": ["summary", "location", "cause", "blog_summary"],
+}
+
+COMBINED_TASK = """Respond with ONE JSON object with these fields:
+- "summary": a 1–3 sentence factual summary of the crash
+- "location": the city, road, or area where it happened, otherwise "unknown"
+- "cause": the cause of the crash if explicitly stated, otherwise "unknown"
+- "blog_summary": the full blog summary described above, paragraphs separated by blank lines
+
+Output ONLY valid JSON. No commentary, no markdown, no extra text."""
+
+def _llama_server_combined(article, timeout=None):
+    """
+    Extraction fields plus blog summary from a single schema-constrained
+    llama-server call; raises on any failure.
+    """
+    clean_text, facts = _blog_inputs(article)
+    facts_json = compact_facts(facts)
+    prompt = fit_prompt(
+        lambda text: _blog_prompt(facts_json, text, task=COMBINED_TASK),
+        clean_text, facts
+    )
+
+    payload = {
+        "model": setting("LLAMA_SERVER_MODEL", LLAMA_SERVER_MODEL),
+        "messages": [
+            {
+                "role": "system",
+                "content": (
+                    "You write clear, factual, narrative-style blog summaries "
+                    "and extract incident details. You output ONLY valid JSON "
+                    "and write only in English."
+                )
+            },
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": COMBINED_TEMPERATURE,
+        # llama-server turns the schema into a grammar, so the reply always parses
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "incident", "schema": INCIDENT_SCHEMA},
+        },
+    }
+    cache_key = llm_cache_key(
+        payload["model"], "llama_server_combined",
+        {"temperature": COMBINED_TEMPERATURE},
+        json.dumps(payload["messages"])
+    )
+    cached = LLM_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        text = llama_chat(
+            payload, "llama_server_combined", timeout=timeout, stop_after_json=True
+        )
+        result = json.loads(text[text.index("{"):])
+        if not all(isinstance(result.get(k), str) for k in INCIDENT_SCHEMA["required"]):
+            raise ValueError("missing fields")
+    except (AttributeError, ValueError) as e:
+        raise LLMOutputError(f"llama-server returned invalid JSON: {e}")
+    LLM_CACHE.put(cache_key, result)
+    return result
+
+def combined_extract(article):
+    """
+    (extracted, blog) from one llama-server call, or None if it failed and
+    the caller should fall back to the separate calls.
+    """
+    breaker = LLM_BACKENDS["llama_server"]["breaker"]
+    if not breaker.allow():
+        return None
+
+    try:
+        result = _llama_server_combined(article, timeout=backend_timeout("llama_server"))
+    except LLMOutputError as e:
+        breaker.record_success()
+        logging.error(f"Combined extraction error: {e}")
+        return None
+    except Exception as e:
+        breaker.record_failure()
+        logging.error(f"Combined extraction error: {e}")
+        return None
+
+    breaker.record_success()
+    extracted = {k: result[k] for k in ("summary", "location", "cause")}
+    return extracted, result["blog_summary"].strip()
+
+# -----------------------------
+# LLM BACKEND REGISTRY
+# -----------------------------
+
+LLM_BACKENDS = {}
+
+class CircuitBreaker:
+    """
+    Skips a backend after `threshold` consecutive failures. Once `cooldown`
+    seconds have passed one trial call is let through; success closes the
+    circuit again, failure restarts the cooldown.
+    """
+
+    def __init__(self, name, threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown=CIRCUIT_COOLDOWN_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._trial_running and time.time() - self.opened_at >= self.cooldown:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            trial_failed = self._trial_running
+            self._trial_running = False
+            if trial_failed or self.failures >= self.threshold:
+                if self.opened_at is None or trial_failed:
+                    logging.error(f"{self.name}: circuit open for {self.cooldown}s")
+                self.opened_at = time.time()
+
+def register_backend(name, extract, timeout):
+    """
+    Make `extract(article, timeout=...)` selectable by name. It must return
+    a {summary, location, cause} dict and raise on failure.
+    """
+    LLM_BACKENDS[name] = {
+        "extract": extract,
+        "timeout": timeout,
+        "breaker": CircuitBreaker(name),
+    }
+
+def backend_timeout(name):
+    timeouts = setting("LLM_BACKEND_TIMEOUTS", {})
+    return timeouts.get(name, LLM_BACKENDS[name]["timeout"])
+
+register_backend("llama_server", _llama_server_extract, timeout=LLM_READ_TIMEOUT)
+register_backend("ollama", _ollama_extract, timeout=LLM_READ_TIMEOUT)
+register_backend("gemini", _gemini_extract, timeout=60)
+
+def extract_incident(article, chain=None):
+    """
+    summary/location/cause from the first backend in the chain that answers
+    (LLM_BACKEND_CHAIN, also settable in cred.json). Backends with an
+    open circuit are skipped without a request. A backend that answers with
+    unusable output is skipped for this article but not counted as down.
+    """
+    chain = chain or setting("LLM_BACKEND_CHAIN", LLM_BACKEND_CHAIN)
+    for name in chain:
+        backend = LLM_BACKENDS.get(name)
+        if backend is None:
+            logging.error(f"Unknown LLM backend: {name}")
+            continue
+        breaker = backend["breaker"]
+        if not breaker.allow():
+            continue
+
+        try:
+            result = backend["extract"](article, timeout=backend_timeout(name))
+        except LLMOutputError as e:
+            breaker.record_success()
+            logging.error(f"{name} extraction error: {e}")
+            continue
+        except Exception as e:
+            breaker.record_failure()
+            logging.error(f"{name} extraction error: {e}")
+            continue
+
+        breaker.record_success()
+        return result
+
+    return {
+        "summary": "unknown",
+        "location": "unknown",
+        "cause": "unknown"
+    }
+
 # -----------------------------
 #  WARM UP OLLAMA LLM
 # -----------------------------
 def warm_up_ollama():
+    import ollama
+
     try:
         ollama.generate(
-            model="qwen2:0.5b",
+            model=setting("OLLAMA_MODEL", OLLAMA_MODEL),
             prompt="Ready.",
             options={"num_predict": 1}
         )
@@ -843,39 +2967,246 @@ def warm_up_ollama():
 # GNEWS FETCH
 # -----------------------------
 
-def fetch_gnews_articles():
-    """Fetch accident-related news using GNews.io."""
-    
-    query = (
-        '("Charleston SC" OR "Charleston South Carolina" OR "North Charleston" OR "Mount Pleasant SC" OR "Mount Pleasnt South Carolina" OR "Summerville" OR "Goose Creek") ("crash" OR "collision" OR "wreck")'
-        #'("Spartanburg" OR "Greenville" OR "Anderson" OR "Duncan" OR "Lyman" OR "Boiling Springs") ("crash" OR "collision" OR "wreck")'
-    )
+GNEWS_SEARCH_URL = "https://gnews.io/api/v4/search"
+GNEWS_STATE_PATH = os.path.join(CACHE_DIR, "gnews_state.json")
+
+GNEWS_PAGE_SIZE = 50       # articles per request ("max")
+GNEWS_MAX_PAGES = 5        # requests per run at most
+GNEWS_DAILY_QUOTA = 100    # requests per UTC day ("GNEWS_DAILY_QUOTA" in cred.json)
+GNEWS_LOOKBACK_DAYS = 30   # window for the first run, before a watermark exists
+# Searches start this far before the watermark, so articles sharing its
+# timestamp or indexed late are still listed; the incident store skips the
+# ones already processed
+GNEWS_OVERLAP = timedelta(hours=1)
+
+GNEWS_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Search query per region; every incident is tagged with the region that found it
+GNEWS_REGIONS = {
+    "charleston": '("Charleston SC" OR "Charleston South Carolina" OR "North Charleston" OR "Mount Pleasant SC" OR "Mount Pleasnt South Carolina" OR "Summerville" OR "Goose Creek") ("crash" OR "collision" OR "wreck")',
+    "upstate": '("Spartanburg" OR "Greenville" OR "Anderson" OR "Duncan" OR "Lyman" OR "Boiling Springs") ("crash" OR "collision" OR "wreck")',
+}
+
+# Regions searched each run ("ACTIVE_REGIONS" in cred.json), in merge order
+ACTIVE_REGIONS = ["charleston", "upstate"]
 
-    today_utc = datetime.now(timezone.utc)
-    from_date = (today_utc - timedelta(days=30)).strftime("%Y-%m-%d")
+# Minimum seconds between GNews requests, shared by all region queries
+GNEWS_MIN_INTERVAL = 1.0
 
-    url = "https://gnews.io/api/v4/search"
+class RateLimiter:
+    """Spaces calls to wait() at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+GNEWS_RATE_LIMITER = RateLimiter(GNEWS_MIN_INTERVAL)
+
+class GNewsState:
+    """
+    Ingestion state kept between runs: per region, the newest `publishedAt`
+    already processed (the watermark), the upper end of a backlog still to
+    fetch, and the number of API requests made today.
+
+    GNews sorts newest first, so a search cut short by GNEWS_MAX_PAGES or
+    the quota misses the oldest part of its window. The region then gets a
+    backfill bound: later searches only look at (watermark, bound], and
+    the watermark stays put until such a search comes back complete.
+    """
+
+    def __init__(self, path=GNEWS_STATE_PATH):
+        self.path = path
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._state is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def watermark(self, region):
+        with self._lock:
+            return self._load().get("watermarks", {}).get(region)
+
+    def backfill_to(self, region):
+        with self._lock:
+            return self._load().get("backfill", {}).get(region)
+
+    def set_backfill_to(self, region, published):
+        """Record (or with None, clear) the newest publishedAt of a region's unfetched backlog."""
+        with self._lock:
+            backfill = self._load().setdefault("backfill", {})
+            if published:
+                backfill[region] = published
+            else:
+                backfill.pop(region, None)
+
+    def advance(self, articles):
+        """
+        Move each region's watermark up to its newest publishedAt in
+        `articles`. Regions with a backlog still to fetch keep theirs.
+        """
+        with self._lock:
+            state = self._load()
+            watermarks = state.setdefault("watermarks", {})
+            backfill = state.get("backfill", {})
+            for art in articles + [d for a in articles for d in a.get("duplicates", [])]:
+                region, published = art.get("region"), art.get("publishedAt")
+                if region in backfill:
+                    continue
+                if region and published and published > watermarks.get(region, ""):
+                    watermarks[region] = published
+
+    def take_request(self, quota):
+        """Count one API request against today's quota; False if it is spent."""
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            usage = self._load().setdefault("usage", {})
+            if usage.get("date") != today:
+                usage.clear()
+                usage.update(date=today, requests=0)
+            if usage["requests"] >= quota:
+                return False
+            usage["requests"] += 1
+            return True
+
+    def save(self):
+        with self._lock:
+            if self._state is None:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+GNEWS_STATE = GNewsState()
+
+def gnews_from_date(watermark):
+    """`from` for the next search: GNEWS_OVERLAP before the watermark, else the lookback window."""
+    if watermark:
+        try:
+            since = datetime.strptime(watermark, GNEWS_TIME_FORMAT) - GNEWS_OVERLAP
+            return since.strftime(GNEWS_TIME_FORMAT)
+        except ValueError:
+            logging.error(f"Ignoring bad GNews watermark: {watermark}")
+    since = datetime.now(timezone.utc) - timedelta(days=GNEWS_LOOKBACK_DAYS)
+    return since.strftime(GNEWS_TIME_FORMAT)
+
+def fetch_gnews_articles(region="charleston", state=None):
+    """
+    Fetch accident-related news for one region using GNews.io, published
+    since the region's last processed article, page by page until the
+    results run out, GNEWS_MAX_PAGES is reached or the daily quota is spent.
+    Each article is tagged with `region`. A search cut short leaves a
+    backfill bound, so the next one continues below the oldest article
+    fetched here (see GNewsState).
+    """
+    state = state or GNEWS_STATE
+    query = GNEWS_REGIONS[region]
 
     params = {
         "q": query,
         "lang": "en",
         "country": "us",
-        "from": from_date, # last 30 days
+        "from": gnews_from_date(state.watermark(region)),
         "in": DOMAIN_FILTER,   # domain filter
-        "max": 50,
-        "apikey": GNEWS_API_KEY
+        "sortby": "publishedAt",
+        "max": GNEWS_PAGE_SIZE,
     }
+    backfill_to = state.backfill_to(region)
+    if backfill_to:
+        params["to"] = backfill_to
 
-    logging.info("Running GNews.io request...")
+    logging.info(f"Running GNews.io request for {region}...")
     logging.info(f"Query: {query}")
     logging.info(f"Params: {json.dumps(params, indent=2)}")
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    quota = setting("GNEWS_DAILY_QUOTA", GNEWS_DAILY_QUOTA)
+    articles = []
+    complete = False
+    try:
+        for page in range(1, GNEWS_MAX_PAGES + 1):
+            if not state.take_request(quota):
+                logging.error(f"GNews daily quota of {quota} requests reached")
+                break
 
-    log_response("Raw GNews.io response", data)
+            GNEWS_RATE_LIMITER.wait()
+            with METRICS.span("gnews_fetch"):
+                response = http_get(
+                    GNEWS_SEARCH_URL,
+                    params=dict(params, page=page, apikey=get_conf()["GNEWS_API_KEY"])
+                )
+                data = response.json()
+            METRICS.count("gnews_bytes", len(response.content))
+            METRICS.count("gnews_requests")
+            log_response(f"Raw GNews.io response ({region}, page {page})", data)
+            if response.status_code != 200:
+                logging.error(f"GNews error {response.status_code}: {data.get('errors')}")
+                break
 
-    return data.get("articles", [])
+            batch = data.get("articles", [])
+            for art in batch:
+                art["region"] = region
+            articles.extend(batch)
+            if len(batch) < GNEWS_PAGE_SIZE or page * GNEWS_PAGE_SIZE >= data.get("totalArticles", 0):
+                complete = True
+                break
+
+        if complete:
+            state.set_backfill_to(region, None)
+        elif articles:
+            # Newest first: everything older than this page is still unseen
+            oldest = min(art.get("publishedAt") or "" for art in articles)
+            logging.info(f"GNews results for {region} cut short; continuing below {oldest} next run")
+            state.set_backfill_to(region, oldest or backfill_to)
+    finally:
+        state.save()
+
+    return articles
+
+def fetch_all_regions(regions=None, state=None):
+    """
+    Query every active region concurrently and merge the results, deduped
+    by URL and title. An article found by several regions keeps the tag of
+    the first one in `regions`.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if regions is None:
+        regions = setting("ACTIVE_REGIONS", ACTIVE_REGIONS)
+    state = state or GNEWS_STATE
+    if not regions:
+        logging.error("No active regions configured (ACTIVE_REGIONS is empty)")
+        return []
+
+    def fetch(region):
+        try:
+            return fetch_gnews_articles(region, state)
+        except Exception as e:
+            logging.error(f"GNews fetch failed for {region}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        results = list(pool.map(fetch, regions))
+
+    articles = [art for batch in results for art in batch]
+    with METRICS.span("dedupe"):
+        articles = dedupe_articles(articles)
+        return dedupe_article_title(articles)
 # -----------------------------
 # BUILD THE EMAIL BODY
 # -----------------------------
@@ -883,12 +3214,14 @@ def build_email_body(incidents):
     separator = "\n" + ("-" * 70) + "\n"
     blocks = []
     for inc in incidents:
+        sources = "".join(f"Also reported: {src}\n" for src in inc.get('sources', []))
         block = f"""Title: {inc.get('title', 'N/A')}
 Published: {inc.get('published', 'N/A')}
+Region: {inc.get('region', 'N/A')}
 Location: {inc.get('location', 'N/A')}
 Cause: {inc.get('cause', 'N/A')}
 URL: {inc.get('url', 'N/A')}
-Summary:
+{sources}Summary:
 {inc.get('summary', 'N/A')}
 """
         blocks.append(block.strip())
@@ -898,21 +3231,28 @@ Summary:
 # EMAIL BLOCK
 # -----------------------------
 def send_incident_email(incidents):
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     body = build_email_body(incidents)
 
     msg = MIMEMultipart('alternative')
     msg['Subject'] = "Accident report"
-    msg['From'] = EMAIL_FROM
-    msg['To'] = EMAIL_TO
+    conf = get_conf()
+    msg['From'] = conf["FROM_EMAIL"]
+    msg['To'] = conf["TO_EMAIL"]
     msg.attach(MIMEText(body, 'plain'))
 
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(EMAIL_FROM, EMAIL_PASSWORD)
+        with METRICS.span("email"), smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+            server.login(conf["FROM_EMAIL"], conf["APP_PASSWORD"])
             server.send_message(msg)
         print("Email sent")
+        return True
     except Exception as e:
         print("Email error: {e}")
+        return False
 # -----------------------------
 # DEDUPLICATION BASED ON URL
 #------------------------------
@@ -945,49 +3285,952 @@ def dedupe_article_title(articles):
     return unique
 
 # -----------------------------
-# MAIN PIPELINE
+# NEAR-DUPLICATE STORY CLUSTERING
 # -----------------------------
+# Outlets word the same crash differently, so exact URL/title dedupe misses
+# them. Articles are compared by MinHash over the words of title,
+# description and content (plus names from extract_structured_facts);
+# each cluster is processed once and the rest are kept as extra sources.
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BAND_ROWS = 2            # 32 bands of 2 rows: finds pairs down to ~0.2 similarity
+NEAR_DUP_THRESHOLD = 0.5         # estimated Jaccard similarity to merge
+NEAR_DUP_NAME_THRESHOLD = 0.3    # ...when both stories name the same person
+NEAR_DUP_MAX_DAYS = 3            # never merge stories published further apart
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MINHASH_SEEDS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
 
-def run_test_pipeline():
+SIMILARITY_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or said says that
+the their this to was were who will with after near
+""".split())
 
-    # print("Warming up Ollama LLM")
-    # warm_up_ollama()
-    
-    articles = fetch_gnews_articles()
-    articles = dedupe_articles(articles)
-    articles = dedupe_article_title(articles)
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
 
-    logging.info(f"Found {len(articles)} raw articles")
+def _story_text(art):
+    # Newlines keep NAME from matching across the field boundaries
+    return "\n".join(filter(None, (art.get("title"), art.get("description"), art.get("content"))))
 
-    MAX_GEMINI = 10
-    articles = articles[:MAX_GEMINI]
+def _fact_people(facts):
+    """
+    {lowercased name: age or None} for the people involved, from
+    extract_structured_facts. Officials are left out; the same spokesperson
+    appears in unrelated crashes.
+    """
+    people = {}
+    for key in ("people", "victims", "passengers", "driver", "suspect"):
+        value = facts.get(key)
+        for item in value if isinstance(value, list) else [value]:
+            age = None
+            if isinstance(item, dict):
+                item, age = item.get("name"), item.get("age")
+            if isinstance(item, str) and item:
+                people[item.lower()] = age or people.get(item.lower())
+    return people
+
+def minhash_signature(tokens):
+    hashes = [
+        int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big")
+        for t in tokens
+    ]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _MINHASH_SEEDS
+    )
 
-    incidents = []
+def _published(art):
+    try:
+        return datetime.strptime(art.get("publishedAt") or "", GNEWS_TIME_FORMAT)
+    except ValueError:
+        return None
 
+def _compatible(a, b):
+    """False if two fingerprinted stories can't be one incident, however similar."""
+    if a["published"] and b["published"]:
+        if abs(a["published"] - b["published"]) > timedelta(days=NEAR_DUP_MAX_DAYS):
+            return False
+    if a["people"] and b["people"]:
+        shared = a["people"].keys() & b["people"].keys()
+        if not shared:
+            return False   # both name people, none in common
+        for name in shared:
+            ages = a["people"][name], b["people"][name]
+            if None not in ages and ages[0] != ages[1]:
+                return False   # same name, different person
+    return True
+
+def _same_incident(a, b):
+    """Whether two fingerprinted stories are close enough to be one incident."""
+    if not _compatible(a, b):
+        return False
+    similarity = sum(x == y for x, y in zip(a["sig"], b["sig"])) / MINHASH_PERMUTATIONS
+    if a["people"] and b["people"]:
+        return similarity >= NEAR_DUP_NAME_THRESHOLD
+    return similarity >= NEAR_DUP_THRESHOLD
+
+def cluster_near_duplicates(articles):
+    """
+    One representative per incident, in input order. The representative is
+    the member with the most text; the others go in its "duplicates" list.
+    """
+    prints = []
     for art in articles:
-        # extracted = gemini_extract(art)
-        # extracted = ollama_extract(art)
-        extracted = llama_server_extract(art)
-        if not extracted:
+        text = _story_text(art)
+        people = _fact_people(extract_structured_facts(text))
+        tokens = {w for w in WORD_RE.findall(text.lower()) if w not in SIMILARITY_STOPWORDS}
+        tokens.update(f"name:{n}" for n in people)
+        prints.append({
+            "sig": minhash_signature(tokens),
+            "people": people,
+            "published": _published(art),
+        })
+
+    parent = list(range(len(articles)))
+    members_of = {i: [i] for i in range(len(articles))}   # by cluster root
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # LSH: only pairs sharing a band are compared
+    buckets = defaultdict(list)
+    for i, fp in enumerate(prints):
+        if fp["sig"] is None:
             continue
-        blog = qwen_blog_summary(art)
+        for start in range(0, MINHASH_PERMUTATIONS, MINHASH_BAND_ROWS):
+            buckets[(start, fp["sig"][start:start + MINHASH_BAND_ROWS])].append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j or not _same_incident(prints[i], prints[j]):
+                    continue
+                # Complete linkage: a story naming nobody must not join two
+                # clusters whose people rule each other out
+                if all(_compatible(prints[x], prints[y])
+                       for x in members_of[root_i] for y in members_of[root_j]):
+                    parent[root_j] = root_i
+                    members_of[root_i].extend(members_of.pop(root_j))
+
+    clusters = defaultdict(list)
+    for i in range(len(articles)):
+        clusters[find(i)].append(i)
+
+    representatives = []
+    for members in sorted(clusters.values()):
+        best = max(members, key=lambda i: len(_story_text(articles[i])))
+        rep = dict(articles[best])
+        rep["duplicates"] = [articles[i] for i in members if i != best]
+        representatives.append(rep)
+
+    merged = len(articles) - len(representatives)
+    if merged:
+        logging.info(f"Near-duplicate clustering: {merged} articles attached to other stories")
+    return representatives
+
+# -----------------------------
+# INCIDENT STORE
+# -----------------------------
+# Every processed article is kept, so later runs skip what they have seen
+# (by URL, normalized title, or as a known duplicate source) before any
+# fetch or LLM work, and the email only carries new or changed incidents.
+
+INCIDENT_STORE_PATH = os.path.join(CACHE_DIR, "incidents.sqlite")
+
+# Blog summary of a failed run; such incidents are retried, not kept as known
+FAILED_SUMMARY = "Unable to generate blog summary."
+
+INCIDENT_FIELDS = ("title", "url", "published", "region", "sources", "summary", "location", "cause")
+
+def normalized_title(title):
+    return (title or "").strip().lower()
 
-        if not extracted:
+def article_fingerprint(art):
+    """Hash of the GNews text; a change means the story was updated."""
+    text = "\n".join(art.get(k) or "" for k in ("title", "description", "content"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class IncidentStore:
+    """
+    SQLite table of processed incidents keyed by URL, with the normalized
+    title, GNews fingerprint, extracted fields, blog summary and when each
+    was last emailed. Duplicate-source URLs map to their incident.
+    """
+
+    def __init__(self, path=INCIDENT_STORE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS incidents (
+                    url TEXT PRIMARY KEY,
+                    title_key TEXT NOT NULL,
+                    title TEXT,
+                    published_at TEXT,
+                    region TEXT,
+                    location TEXT,
+                    cause TEXT,
+                    summary TEXT,
+                    sources TEXT NOT NULL DEFAULT '[]',
+                    fingerprint TEXT,
+                    first_seen REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    emailed_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_incidents_title_key ON incidents(title_key);
+                CREATE INDEX IF NOT EXISTS idx_incidents_published_at ON incidents(published_at);
+                CREATE INDEX IF NOT EXISTS idx_incidents_location ON incidents(location);
+                CREATE INDEX IF NOT EXISTS idx_incidents_cause ON incidents(cause);
+                CREATE INDEX IF NOT EXISTS idx_incidents_emailed_at ON incidents(emailed_at);
+                CREATE TABLE IF NOT EXISTS incident_sources (
+                    url TEXT PRIMARY KEY,
+                    incident_url TEXT NOT NULL
+                );
+            """)
+        return self._conn
+
+    def is_known(self, art):
+        """
+        True if the article, or a syndicated copy or known duplicate of it,
+        is already stored, unchanged and successfully summarized.
+        """
+        url = art.get("url")
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT fingerprint, summary FROM incidents WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                return row[0] == article_fingerprint(art) and row[1] != FAILED_SUMMARY
+            if db.execute("SELECT 1 FROM incident_sources WHERE url = ?", (url,)).fetchone():
+                return True
+            # Same headline only counts near the same date; outlets reuse
+            # template titles ("Deadly crash in North Charleston")
+            published = _published(art)
+            if published is None:
+                return False
+            window = timedelta(days=NEAR_DUP_MAX_DAYS)
+            row = db.execute("""
+                SELECT 1 FROM incidents
+                WHERE title_key = ? AND summary != ? AND published_at BETWEEN ? AND ?
+                LIMIT 1
+            """, (
+                normalized_title(art.get("title")), FAILED_SUMMARY,
+                (published - window).strftime(GNEWS_TIME_FORMAT),
+                (published + window).strftime(GNEWS_TIME_FORMAT),
+            )).fetchone()
+            return row is not None
+
+    def split_known(self, articles):
+        """(new or updated articles, already known articles)."""
+        fresh, known = [], []
+        for art in articles:
+            try:
+                if self.is_known(art):
+                    known.append(art)
+                    continue
+            except sqlite3.Error as e:
+                logging.error(f"Incident store error: {e}")
+            fresh.append(art)
+        METRICS.count("articles_known", len(known))
+        if known:
+            logging.info(f"Incident store: skipped {len(known)} known articles")
+        return fresh, known
+
+    def save(self, articles, incidents):
+        """
+        Store processed incidents. One whose fields changed since it was last
+        stored is queued for email again.
+        """
+        by_url = {art.get("url"): art for art in articles}
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            for inc in incidents:
+                art = by_url.get(inc["url"], {})
+                values = (
+                    normalized_title(inc["title"]), inc["title"], inc["published"],
+                    inc.get("region", ""), inc["location"], inc["cause"], inc["summary"],
+                    json.dumps(inc.get("sources", [])), article_fingerprint(art),
+                )
+                old = db.execute(
+                    "SELECT title, location, cause, summary, emailed_at FROM incidents WHERE url = ?",
+                    (inc["url"],),
+                ).fetchone()
+                emailed_at = None
+                if old is not None and old[:4] == (inc["title"], inc["location"], inc["cause"], inc["summary"]):
+                    emailed_at = old[4]
+                db.execute("""
+                    INSERT INTO incidents (title_key, title, published_at, region, location,
+                        cause, summary, sources, fingerprint, url, first_seen, updated_at, emailed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title_key = excluded.title_key, title = excluded.title,
+                        published_at = excluded.published_at, region = excluded.region,
+                        location = excluded.location, cause = excluded.cause,
+                        summary = excluded.summary, sources = excluded.sources,
+                        fingerprint = excluded.fingerprint, updated_at = excluded.updated_at,
+                        emailed_at = excluded.emailed_at
+                """, values + (inc["url"], now, now, emailed_at))
+                for src in inc.get("sources", []):
+                    db.execute(
+                        "INSERT OR REPLACE INTO incident_sources VALUES (?, ?)", (src, inc["url"])
+                    )
+            db.commit()
+
+    def pending_email(self):
+        """Stored incidents not emailed since they were added or changed, oldest first."""
+        with self._lock:
+            rows = self._db().execute("""
+                SELECT title, url, published_at, region, sources, summary, location, cause
+                FROM incidents
+                WHERE emailed_at IS NULL AND summary != ?
+                ORDER BY published_at
+            """, (FAILED_SUMMARY,)).fetchall()
+        incidents = []
+        for row in rows:
+            inc = dict(zip(INCIDENT_FIELDS, row))
+            inc["sources"] = json.loads(inc["sources"])
+            incidents.append(inc)
+        return incidents
+
+    def mark_emailed(self, incidents):
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "UPDATE incidents SET emailed_at = ? WHERE url = ?",
+                [(time.time(), inc["url"]) for inc in incidents],
+            )
+            db.commit()
+
+INCIDENT_STORE = IncidentStore()
+
+# -----------------------------
+# JOB QUEUE
+# -----------------------------
+# Each article's stages run as durable jobs in cache/jobs.sqlite, so a run
+# that dies (Playwright hang, llama-server crash) resumes from the last
+# completed stage. Workers can also run as separate processes
+# (--worker fetch / --worker inference) sharing the same queue file.
+
+JOB_QUEUE_PATH = os.path.join(CACHE_DIR, "jobs.sqlite")
+
+# Stages in order; each job's data keeps the output of every finished stage
+JOB_STAGES = ("fetch", "clean", "facts", "extract", "summarize")
+
+# Stage groups for --worker: I/O-bound page work and LLM calls scale separately
+JOB_ROLES = {
+    "fetch": ("fetch", "clean", "facts"),
+    "inference": ("extract", "summarize"),
+    "all": JOB_STAGES,
+}
+
+JOB_MAX_ATTEMPTS = 3      # tries per stage before the job is marked failed
+JOB_MAX_RETRY_RUNS = 3    # later runs that retry a failed job before it is dropped
+JOB_LEASE_SECONDS = 900   # a running job older than this is handed out again
+JOB_POLL_SECONDS = 1.0    # idle workers check the queue this often
+JOB_RECOVER_SECONDS = 10  # idle workers look for jobs of dead workers this often
+JOB_CHECKPOINT_SECONDS = 60  # --worker saves domain profiles and its report this often
+
+# One METRICS report per --worker process: <role>-<host>-<pid>.json
+WORKER_REPORT_DIR = os.path.join(CACHE_DIR, "worker_reports")
+
+def _job_fetch(art, data):
+    return {"text": article_full_text(art)}
+
+def _job_clean(art, data):
+    return {"clean_text": clean_full_text(data["text"])}
+
+def _job_facts(art, data):
+    return {"facts": article_facts(data["clean_text"])}
+
+def _job_extract(art, data):
+    prepared = dict(art, clean_text=data["clean_text"], facts=data["facts"])
+    if setting("COMBINED_LLM_CALL", COMBINED_LLM_CALL):
+        combined = combined_extract(prepared)
+        if combined:
+            extracted, blog = combined
+            return {"extracted": extracted, "blog": blog}
+
+    # Backends and their order come from LLM_BACKEND_CHAIN
+    extracted = extract_incident(art)
+    if not extracted:
+        return None
+    return {"extracted": extracted}
+
+def _job_summarize(art, data):
+    if "blog" in data:
+        return {}   # written by the combined call
+    prepared = dict(art, clean_text=data["clean_text"], facts=data["facts"])
+    return {"blog": qwen_blog_summary(prepared)}
+
+JOB_HANDLERS = {
+    "fetch": _job_fetch,
+    "clean": _job_clean,
+    "facts": _job_facts,
+    "extract": _job_extract,
+    "summarize": _job_summarize,
+}
+
+def _process_start(pid):
+    """Start time of `pid` (clock ticks since boot), or None without /proc."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+# Tells this process apart from an earlier one that had the same PID
+_WORKER_NONCE = _process_start(os.getpid()) or os.urandom(4).hex()
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{_WORKER_NONCE}"
+
+def _worker_alive(worker):
+    """
+    False for a worker on this host whose process has exited, or whose PID
+    now belongs to another process (this one included).
+    """
+    parts = (worker or "").rsplit(":", 2)
+    if len(parts) != 3 or parts[0] != socket.gethostname() or not parts[1].isdigit():
+        return True
+    _, pid, nonce = parts
+    pid = int(pid)
+    if pid == os.getpid():
+        return nonce == _WORKER_NONCE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    start = _process_start(pid)
+    return start is None or start == nonce
+
+class JobQueue:
+    """
+    SQLite queue with one row per article. `step` is the index in JOB_STAGES
+    of the next stage to run (len(JOB_STAGES) once done); `data` holds the
+    outputs of the finished stages. Claims use BEGIN IMMEDIATE, so several
+    processes can share the file.
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        # Bumped whenever a job in this process moves on, so idle local
+        # workers wake at once; other processes' progress is seen by polling
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    url TEXT PRIMARY KEY,
+                    article TEXT NOT NULL,
+                    published_at TEXT,
+                    step INTEGER NOT NULL DEFAULT 0,
+                    state TEXT NOT NULL DEFAULT 'ready',
+                    data TEXT NOT NULL DEFAULT '{}',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    retry_runs INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    started_at REAL,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(state, step, published_at);
+            """)
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _notify(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, seen, timeout=JOB_POLL_SECONDS):
+        """Sleep until `version` moves past `seen`, at most `timeout` seconds."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen, timeout)
+
+    def enqueue(self, articles):
+        """
+        Add articles as jobs at the first stage. Unfinished jobs keep their
+        progress; failed ones get a fresh set of attempts.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            for art in articles:
+                db.execute("""
+                    INSERT INTO jobs (url, article, published_at, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        article = excluded.article, state = 'ready', attempts = 0,
+                        error = NULL, updated_at = excluded.updated_at
+                    WHERE jobs.state = 'failed'
+                """, (art["url"], json.dumps(art), art.get("publishedAt") or "", now))
+
+    def recover(self):
+        """Hand out again the running jobs of dead local workers or expired leases."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT url, worker, started_at FROM jobs WHERE state = 'running'"
+            ).fetchall()
+        stale = [
+            row for row in rows
+            if not _worker_alive(row[1]) or time.time() - (row[2] or 0) > JOB_LEASE_SECONDS
+        ]
+        if not stale:
+            return
+        with self._transaction() as db:
+            # Only if still held by the same claim; it may have moved on since
+            db.executemany("""
+                UPDATE jobs SET state = 'ready', worker = NULL
+                WHERE url = ? AND state = 'running' AND worker IS ? AND started_at IS ?
+            """, stale)
+        logging.info(f"Job queue: resuming {len(stale)} interrupted jobs")
+        self._notify()
+
+    def claim(self, stages, worker):
+        """
+        Mark the next ready job at one of `stages` as running and return it
+        as a dict, or None. Later stages go first so articles already in
+        flight finish before new ones start.
+        """
+        steps = [JOB_STAGES.index(stage) for stage in stages]
+        with self._transaction() as db:
+            row = db.execute(f"""
+                SELECT url, article, step, data, attempts FROM jobs
+                WHERE state = 'ready' AND step IN ({",".join("?" * len(steps))})
+                ORDER BY step DESC, published_at
+                LIMIT 1
+            """, steps).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, started_at = ? WHERE url = ?",
+                (worker, time.time(), row[0]),
+            )
+        url, article, step, data, attempts = row
+        return {
+            "url": url, "article": json.loads(article), "stage": JOB_STAGES[step],
+            "step": step, "data": json.loads(data), "attempts": attempts,
+        }
+
+    def complete(self, job, output, keep_stages=()):
+        """
+        Store a finished stage's output and move to the next stage. None
+        drops the article: the job is done with no incident. If the next
+        stage is in `keep_stages` the caller keeps the job (still running,
+        lease renewed) and gets it back to run that stage; otherwise None.
+        """
+        data = dict(job["data"])
+        step = job["step"] + 1
+        if output is None:
+            data["dropped"] = True
+            step = len(JOB_STAGES)
+        else:
+            data.update(output)
+        keep = step < len(JOB_STAGES) and JOB_STAGES[step] in keep_stages
+        if keep:
+            state = "running"
+        else:
+            state = "done" if step == len(JOB_STAGES) else "ready"
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE jobs SET step = ?, state = ?, data = ?, attempts = 0,
+                    worker = CASE WHEN ? THEN worker END, started_at = ?,
+                    error = NULL, updated_at = ?
+                WHERE url = ?
+            """, (step, state, json.dumps(data), keep, now, now, job["url"]))
+        self._notify()
+        if keep:
+            return dict(job, stage=JOB_STAGES[step], step=step, data=data, attempts=0)
+        return None
+
+    def fail(self, job, error):
+        attempts = job["attempts"] + 1
+        state = "failed" if attempts >= JOB_MAX_ATTEMPTS else "ready"
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE jobs SET state = ?, attempts = ?, worker = NULL, error = ?, updated_at = ?
+                WHERE url = ?
+            """, (state, attempts, str(error), time.time(), job["url"]))
+        self._notify()
+
+    def fail_for_retry(self, job_url, stage, data, error):
+        """Mark a finished job failed at `stage` (with `data` as its input) for retry_failed()."""
+        with self._transaction() as db:
+            db.execute("""
+                UPDATE jobs SET state = 'failed', step = ?, data = ?, error = ?, updated_at = ?
+                WHERE url = ?
+            """, (JOB_STAGES.index(stage), json.dumps(data), error, time.time(), job_url))
+
+    def retry_failed(self):
+        """
+        Queue failed jobs again, each for at most JOB_MAX_RETRY_RUNS runs;
+        past that they are dropped. Their articles are behind the GNews
+        watermark, so the queue is the only place they are retried from.
+        """
+        with self._transaction() as db:
+            given_up = db.execute(
+                "SELECT url, error FROM jobs WHERE state = 'failed' AND retry_runs >= ?",
+                (JOB_MAX_RETRY_RUNS,),
+            ).fetchall()
+            db.execute(
+                "DELETE FROM jobs WHERE state = 'failed' AND retry_runs >= ?",
+                (JOB_MAX_RETRY_RUNS,),
+            )
+            retried = db.execute("""
+                UPDATE jobs SET state = 'ready', attempts = 0, retry_runs = retry_runs + 1,
+                    worker = NULL, updated_at = ?
+                WHERE state = 'failed'
+            """, (time.time(),)).rowcount
+        for url, error in given_up:
+            logging.error(f"Job queue: giving up on {url} after {JOB_MAX_RETRY_RUNS} retries: {error}")
+        if retried:
+            logging.info(f"Job queue: retrying {retried} failed jobs")
+
+    def has_work(self, stages=JOB_STAGES):
+        """True while a job is ready or running at or before the last of `stages`."""
+        last = max(JOB_STAGES.index(stage) for stage in stages)
+        with self._lock:
+            row = self._db().execute(
+                "SELECT 1 FROM jobs WHERE state IN ('ready', 'running') AND step <= ? LIMIT 1",
+                (last,),
+            ).fetchone()
+        return row is not None
+
+    def finished(self):
+        """(article, data, state) for every done or failed job."""
+        with self._lock:
+            rows = self._db().execute("""
+                SELECT article, data, state FROM jobs
+                WHERE state IN ('done', 'failed')
+                ORDER BY published_at
+            """).fetchall()
+        return [(json.loads(article), json.loads(data), state) for article, data, state in rows]
+
+    def remove(self, articles):
+        with self._transaction() as db:
+            db.executemany("DELETE FROM jobs WHERE url = ?", [(art["url"],) for art in articles])
+
+JOB_QUEUE = JobQueue()
+
+def run_job(job, stages=JOB_STAGES, queue=None):
+    """
+    Run a claimed job's stage, and the ones after it while they are in
+    `stages`, recording each result. The "article" span covers them all.
+    """
+    queue = queue or JOB_QUEUE
+    with METRICS.span("article", article_domain(job["url"])):
+        while job is not None:
+            try:
+                output = JOB_HANDLERS[job["stage"]](job["article"], job["data"])
+            except Exception as e:
+                logging.error(f"{job['stage']} job failed for {job['url']}: {e}")
+                queue.fail(job, e)
+                return
+            job = queue.complete(job, output, keep_stages=stages)
+
+def run_job_worker(stages=JOB_STAGES, queue=None, drain=True):
+    """
+    Claim and run jobs at `stages` until the queue has nothing left for them
+    (drain) or forever, polling every JOB_POLL_SECONDS when idle.
+    """
+    queue = queue or JOB_QUEUE
+    me = worker_id()
+    recovered_at = time.time()
+    while True:
+        seen = queue.version
+        job = queue.claim(stages, me)
+        if job is None:
+            if drain and not queue.has_work(stages):
+                return
+            # Another worker process may have died holding jobs
+            if time.time() - recovered_at >= JOB_RECOVER_SECONDS:
+                queue.recover()
+                recovered_at = time.time()
+            queue.wait(seen)
             continue
+        run_job(job, stages, queue)
 
-        incidents.append({
-            "title": art.get("title", ""),
-            "url": art.get("url", ""),
-            "published": art.get("publishedAt", "Unknown"),
-            "summary": blog,
-            "location": extracted.get("location", ""),
-            "cause": extracted.get("cause", "")
-        })
+def run_job_workers(stages=JOB_STAGES, threads=ARTICLE_WORKERS, drain=True, checkpoint=None):
+    """
+    run_job_worker on `threads` threads; per-stage concurrency still follows
+    STAGE_LIMITS. `checkpoint()`, if given, is called every
+    JOB_CHECKPOINT_SECONDS while they run.
+    """
+    queue = JOB_QUEUE
+    if threads <= 1 and checkpoint is None:
+        run_job_worker(stages, queue, drain)
+        return
+    pool = [
+        threading.Thread(target=run_job_worker, args=(stages, queue, drain), daemon=True)
+        for _ in range(max(threads, 1))
+    ]
+    for t in pool:
+        t.start()
+    for t in pool:
+        while t.is_alive():
+            t.join(timeout=JOB_CHECKPOINT_SECONDS)
+            if t.is_alive() and checkpoint is not None:
+                checkpoint()
+
+def _stop_on_sigterm(signum, frame):
+    raise SystemExit(f"Stopped by signal {signum}")
+
+def run_worker(role, threads=None, drain=False):
+    """
+    Entry point for --worker: serve one role's stages from the shared queue.
+    Domain profiles and this worker's METRICS report (in WORKER_REPORT_DIR)
+    are saved periodically and on exit, SIGTERM included. Jobs it was
+    running when stopped are handed out again by recover().
+    """
+    stages = JOB_ROLES[role]
+    slots = None
+    if {"extract", "summarize"} & set(stages):
+        slots = match_llama_server_slots()   # the coordinator does no inference here
+    if threads is None:
+        threads = max(ARTICLE_WORKERS, 2 * slots) if slots else ARTICLE_WORKERS
+    report_path = os.path.join(
+        WORKER_REPORT_DIR, f"{role}-{socket.gethostname()}-{os.getpid()}.json"
+    )
+
+    def checkpoint():
+        DOMAIN_PROFILES.save()
+        try:
+            METRICS.write(report_path)
+        except OSError as e:
+            logging.error(f"Could not write worker report: {e}")
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop_on_sigterm)
+
+    logging.info(f"Job worker {worker_id()}: {', '.join(stages)} on {threads} threads")
+    METRICS.reset()
+    JOB_QUEUE.recover()
+    try:
+        run_job_workers(stages, threads=threads, drain=drain, checkpoint=checkpoint)
+    finally:
+        BROWSER_POOL.close()
+        checkpoint()
 
-    print(f"\n=== Extracted {len(incidents)} Incidents ===")
+# -----------------------------
+# MAIN PIPELINE
+# -----------------------------
+
+def make_incident(art, extracted, blog):
+    return {
+        "title": art.get("title", ""),
+        "url": art.get("url", ""),
+        "published": art.get("publishedAt", "Unknown"),
+        "region": art.get("region", ""),
+        "sources": [dup.get("url", "") for dup in art.get("duplicates", [])],
+        "summary": blog,
+        "location": extracted.get("location", ""),
+        "cause": extracted.get("cause", "")
+    }
+
+def collect_jobs():
+    """
+    (finished articles, incidents, articles whose jobs can be removed).
+    Failed jobs, and ones whose blog summary failed, stay queued for
+    retry_failed() on a later run.
+    """
+    articles, incidents, removable = [], [], []
+    for art, data, state in JOB_QUEUE.finished():
+        articles.append(art)
+        if state == "failed":
+            METRICS.count("articles_failed")
+        elif data.get("dropped"):
+            METRICS.count("articles_dropped")
+            removable.append(art)
+        elif data["blog"] == FAILED_SUMMARY:
+            retry_data = {k: v for k, v in data.items() if k not in ("extracted", "blog")}
+            JOB_QUEUE.fail_for_retry(art["url"], "extract", retry_data, "blog summary failed")
+            METRICS.count("articles_failed")
+        else:
+            incidents.append(make_incident(art, data["extracted"], data["blog"]))
+            METRICS.count("incidents")
+            removable.append(art)
+    return articles, incidents, removable
+
+def run_test_pipeline(workers=None, max_articles=MAX_ARTICLES, local_workers=True):
+    """
+    Fetch, queue and process the day's articles, then email new incidents.
+    With local_workers=False the stages are left to --worker processes.
+    """
 
-    send_incident_email(incidents)
+    # print("Warming up Ollama LLM")
+    # warm_up_ollama()
+    
+    if PROFILER is None and os.environ.get(PROFILE_ENV):
+        enable_profiling(os.environ[PROFILE_ENV])
+
+    METRICS.reset()
+    articles = fetch_all_regions()
+    with METRICS.span("cluster"):
+        articles = cluster_near_duplicates(articles)
+    articles, known = INCIDENT_STORE.split_known(articles)
+
+    logging.info(f"Found {len(articles)} raw articles")
+
+    # Oldest first: when max_articles cuts the list, the watermark only
+    # passes what was processed and the rest is picked up next run
+    articles.sort(key=lambda a: a.get("publishedAt") or "")
+    if max_articles is not None and len(articles) > max_articles:
+        # Cut between two different timestamps, or the watermark would pass
+        # an unprocessed article published in the same second
+        published = [a.get("publishedAt") or "" for a in articles]
+        cut = max_articles
+        while cut > 0 and published[cut - 1] == published[cut]:
+            cut -= 1
+        if cut == 0:
+            cut = max_articles
+            while cut < len(articles) and published[cut] == published[cut - 1]:
+                cut += 1
+        if cut < len(articles):
+            known = [a for a in known if (a.get("publishedAt") or "") < published[cut]]
+        articles = articles[:cut]
+
+    if PROFILER is not None:
+        workers = 1   # keep per-stage memory numbers from mixing
+    elif workers is None:
+        workers = max(ARTICLE_WORKERS, 2 * match_llama_server_slots())
+
+    try:
+        # Jobs left unfinished by an earlier run resume where they stopped,
+        # failed ones get another try
+        JOB_QUEUE.retry_failed()
+        JOB_QUEUE.enqueue(articles)
+        JOB_QUEUE.recover()
+        if local_workers:
+            run_job_workers(threads=workers)
+        else:
+            logging.info("Waiting for --worker processes to finish the queued jobs")
+            recovered_at = time.time()
+            while JOB_QUEUE.has_work():
+                if time.time() - recovered_at >= JOB_RECOVER_SECONDS:
+                    JOB_QUEUE.recover()   # jobs of a worker that died
+                    recovered_at = time.time()
+                time.sleep(JOB_POLL_SECONDS)
+
+        # Failed articles stay in the job queue, so the watermark may pass them
+        articles, incidents, removable = collect_jobs()
+        INCIDENT_STORE.save(articles, incidents)
+        GNEWS_STATE.advance(articles + known)
+        JOB_QUEUE.remove(removable)
+
+        print(f"\n=== Extracted {len(incidents)} Incidents ===")
+        logging.info(f"LLM cache: {LLM_CACHE.hits} hits, {LLM_CACHE.misses} misses")
+
+        # New and changed incidents, plus any whose email failed last time
+        pending = INCIDENT_STORE.pending_email()
+        if not pending:
+            logging.info("No new incidents to email")
+        elif send_incident_email(pending):
+            INCIDENT_STORE.mark_emailed(pending)
+    finally:
+        BROWSER_POOL.close()
+        DOMAIN_PROFILES.save()
+        GNEWS_STATE.save()
+        write_run_report()
+        finish_profiling()
+
+def write_run_report():
+    """Save this run's METRICS report (and the Prometheus textfile, if configured)."""
+    try:
+        report = METRICS.write(
+            RUN_REPORT_PATH, setting("PROMETHEUS_TEXTFILE", PROMETHEUS_TEXTFILE)
+        )
+    except OSError as e:
+        logging.error(f"Could not write run report: {e}")
+        return
+    slowest = sorted(report["stages"].items(), key=lambda kv: -kv[1]["total_s"])[:5]
+    logging.info("Time by stage: " + ", ".join(f"{k} {v['total_s']}s" for k, v in slowest))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charleston-area crash news digest")
+    parser.add_argument(
+        "--facts-batch", metavar="JSONL",
+        help="extract facts for stored articles (JSON Lines) and print them as JSON Lines"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None,
+        help="worker processes for --facts-batch (default: one per core)"
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="all", metavar="STAGES",
+        help=f"profile CPU and memory per stage (all, or e.g. parse,facts); same as {PROFILE_ENV}"
+    )
+    parser.add_argument(
+        "--worker", choices=sorted(JOB_ROLES), metavar="ROLE",
+        help="run as a job worker: fetch (fetch, clean, facts), inference (extract, summarize) or all"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=None,
+        help=f"threads for --worker (default: {ARTICLE_WORKERS}, or twice the llama-server slots for inference)"
+    )
+    parser.add_argument(
+        "--drain", action="store_true",
+        help="with --worker, exit once the queue is empty instead of waiting for more jobs"
+    )
+    parser.add_argument(
+        "--external-workers", action="store_true",
+        help="queue the articles and wait for --worker processes instead of running stages here"
+    )
+    args = parser.parse_args(argv)
+
+    if args.facts_batch:
+        run_facts_batch(args.facts_batch, processes=args.processes)
+    elif args.worker:
+        run_worker(args.worker, threads=args.threads, drain=args.drain)
+    else:
+        if args.profile:
+            enable_profiling(args.profile)
+        run_test_pipeline(local_workers=not args.external_workers)
 
 
 if __name__ == "__main__":
-    run_test_pipeline()
+    main()